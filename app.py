@@ -4,15 +4,30 @@
 from __future__ import annotations
 
 import os
+import time
 import uuid
 import json
 import tempfile
-import requests
 import streamlit as st
 
+# Opt-in per-rerun profiling (GMF_PROFILE); started before local imports so they are counted
+import profiling
+profiling.begin("app.py")
+
 # Local modules
 import tools
 import voice
+import metrics
+import summarize
+import conversation
+import search_index
+import jobs
+import prewarm
+import usage
+from transcript import WordTable
+
+# Side-thread /metrics endpoint (idempotent across reruns; GMF_METRICS_PORT=0 disables)
+metrics.serve()
 
 # ---------------------------
 # Helpers
@@ -25,6 +40,14 @@ def _secret(key: str, default: str | None = None) -> str | None:
     except Exception:
         return os.getenv(key, default)
 
+def index_safe(fn, *args, **kwargs):
+    """Best-effort local search indexing; never breaks the UI."""
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        print(f"(warn) search index failed: {e}")
+        return None
+
 def masked(val: str | None, keep: int = 4) -> str:
     if not val:
         return "—"
@@ -34,6 +57,7 @@ def masked(val: str | None, keep: int = 4) -> str:
 # Config / Secrets
 # ---------------------------
 N8N_BUILDER_URL = _secret("N8N_BUILDER_URL")
+N8N_BUILDER_BATCH_URL = _secret("N8N_BUILDER_BATCH_URL")   # batch workflow (gmf/build-batch), optional
 XAI_API_KEY = _secret("XAI_API_KEY")
 ASSEMBLYAI_API_KEY = _secret("ASSEMBLYAI_API_KEY")
 LIVEKIT_API_KEY = _secret("LIVEKIT_API_KEY")
@@ -41,43 +65,20 @@ LIVEKIT_API_SECRET = _secret("LIVEKIT_API_SECRET")
 LIVEKIT_URL = _secret("LIVEKIT_URL") or "wss://cloud.livekit.io"
 N8N_WORKSPACE_URL = _secret("N8N_WORKSPACE_URL")
 STREAMLIT_ACCOUNT = _secret("STREAMLIT_ACCOUNT")
+# Run heavy calls on the jobs.py worker pool (`python jobs.py worker`) instead of inline
+USE_JOBS = (_secret("GMF_JOBS") or "") not in ("", "0", "false")
 
 # ---------------------------
 # n8n Builder client
 # ---------------------------
-def send_to_builder(repo_name: str, notes: str, priority: str, readme: str):
-    """Send structured build request to n8n Builder webhook."""
+def send_to_builder(specs: list[dict]) -> list[tuple[bool, dict | str]]:
+    """Send build requests to n8n: one envelope to the batch workflow if configured, else one post per spec."""
+    if N8N_BUILDER_BATCH_URL:
+        return tools.send_to_builder_batch(specs, url=N8N_BUILDER_BATCH_URL, single_url=N8N_BUILDER_URL)
     if not N8N_BUILDER_URL:
-        return False, "Missing N8N_BUILDER_URL in Streamlit Cloud Secrets."
-
-    payload = {
-        "repo_name": repo_name.strip(),
-        "private": True,
-        "description": f"Created by GMF Builder v1 — priority={priority}" + (f" | {notes}" if notes else ""),
-        "readme": readme or f"# {repo_name}\n\nBootstrapped by GMF Builder v1."
-    }
-
-    try:
-        resp = requests.post(
-            N8N_BUILDER_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=20,
-        )
-        status = resp.status_code
-        text = resp.text
-    except requests.RequestException as e:
-        return False, f"Request error: {e}"
-
-    try:
-        data = resp.json()
-    except Exception:
-        data = {"raw": text, "status": status}
-
-    if 200 <= status < 300:
-        return True, data
-    else:
-        return False, data
+        return [(False, "Missing N8N_BUILDER_URL in Streamlit Cloud Secrets.")] * len(specs)
+    return [tools.send_to_builder(s["repo_name"], s["notes"], s["priority"], s["readme"], url=N8N_BUILDER_URL)
+            for s in specs]
 
 # ---------------------------
 # UI setup
@@ -85,6 +86,65 @@ def send_to_builder(repo_name: str, notes: str, priority: str, readme: str):
 st.set_page_config(page_title="GrokMind Fusion", layout="centered")
 st.title("🧠 GrokMind Fusion")
 
+# Session id shared with the Voice Mode page (same st.session_state keys)
+if "gmf_session_id" not in st.session_state:
+    _sid = f"sess-{uuid.uuid4().hex[:8]}"
+    st.session_state.gmf_session = {"id": _sid, "ts": int(time.time())}
+    st.session_state.gmf_session_id = _sid
+SESSION_ID = st.session_state.gmf_session_id
+usage.bind(session=SESSION_ID, page="app")   # bill upstream calls of this run to the session
+if "gmf_identity" not in st.session_state:
+    st.session_state.gmf_identity = f"user-{uuid.uuid4().hex[:6]}"
+
+# Background prewarm (imports, xAI/AssemblyAI connections, LiveKit token) + browser hints for the LiveKit JS
+prewarm.start(SESSION_ID, page="app", identity=st.session_state.gmf_identity)
+st.components.v1.html(prewarm.browser_hints(), height=0)
+
+# ---------------------------
+# Worker-pool jobs polled across reruns (GMF_JOBS)
+# ---------------------------
+def submit_job(name: str, kind: str, payload: dict, *, label: str, path: str | None = None, **ctx):
+    """
+    Queue a job and remember it in session_state; jobs_panel(name) polls it without blocking reruns.
+    With `path` the file is copied to the shared jobs dir first (the caller may delete its copy).
+    """
+    if path is not None:
+        job_id = jobs.submit_file(kind, path, payload, session=SESSION_ID)
+    else:
+        job_id = jobs.submit(kind, payload, session=SESSION_ID)
+    st.session_state.setdefault("gmf_jobs", {})[name] = {"id": job_id, "t0": time.time(), "label": label, **ctx}
+
+def job_pending(name: str) -> bool:
+    return name in st.session_state.get("gmf_jobs", {})
+
+def finished_job(name: str) -> tuple[dict, dict] | None:
+    """(job, ctx) once jobs_panel saw `name` finish; consumed by the section that submitted it."""
+    return st.session_state.setdefault("gmf_jobs_done", {}).pop(name, None)
+
+@st.fragment(run_every=1.0)
+def jobs_panel(name: str):
+    ctx = st.session_state.get("gmf_jobs", {}).get(name)
+    if ctx is None:
+        return
+    try:
+        job = jobs.poll(ctx["id"])
+    except KeyError:
+        job = {"status": "error", "error": "job vanished from the queue", "worker": None}
+    if job["status"] in ("done", "error"):
+        st.session_state.gmf_jobs.pop(name, None)
+        st.session_state.setdefault("gmf_jobs_done", {})[name] = (job, ctx)
+        st.rerun()
+    st.info(f"⏳ {ctx['label']} — {job['status']} for {time.time() - ctx['t0']:.0f} s")
+
+def post_event(event: str, data: dict):
+    """n8n log post; with GMF_JOBS or N8N_BATCH it is queued fire-and-forget so the rerun never waits."""
+    if USE_JOBS:
+        jobs.submit("n8n_post", {"event": event, "data": data}, session=SESSION_ID)
+    elif tools.N8N_BATCH:
+        tools.n8n_emit(event, data)
+    else:
+        tools.n8n_post(event, data)
+
 # ---- Environment ----
 st.subheader("Environment")
 def check_row(label, value):
@@ -101,27 +161,68 @@ _ = [
     check_row("N8N_WORKSPACE_URL", N8N_WORKSPACE_URL),
     check_row("STREAMLIT_ACCOUNT", STREAMLIT_ACCOUNT),
     check_row("N8N_BUILDER_URL", N8N_BUILDER_URL),
+    check_row("N8N_BUILDER_BATCH_URL", N8N_BUILDER_BATCH_URL),
 ]
 st.divider()
 
 # ---- Chat with Grok ----
 st.header("Chat with Grok")
+for turn in conversation.get(SESSION_ID).turns[-6:]:
+    with st.chat_message(turn["role"]):
+        st.write(turn["content"])
 user_text = st.text_area("Your message", placeholder="Type a question or instruction…", height=120)
 log_n8n = st.checkbox("Post to n8n", value=True)
-
-if st.button("Ask Grok", type="primary", use_container_width=True, disabled=not bool(user_text.strip())):
+colM, colN = st.columns(2)
+with colM:
+    compaction = st.selectbox("Old turns", conversation.COMPACTION_MODES,
+                              format_func=lambda m: {"summary": "Summarise in background", "truncate": "Truncate"}[m])
+with colN:
+    if st.button("New conversation", use_container_width=True):
+        conversation.reset(SESSION_ID)
+        st.rerun()
+
+def _show_chat_reply(prompt: str, reply: str, conv_stats: dict, log: bool):
+    st.success("Grok replied:")
+    st.write(reply)
+    st.caption(
+        f"~{conv_stats['prompt_tokens_est']} / {conv_stats['budget_tokens']} tokens · "
+        f"{conv_stats['history_turns']} turns sent · compacted {conv_stats['compacted_now']} now "
+        f"({conv_stats['summarized_total']} summarised, {conv_stats['dropped_total']} dropped) · "
+        f"{conv_stats['latency_s']} s"
+    )
+    index_safe(search_index.add_reply, reply, prompt=prompt, source="chat", session=SESSION_ID)
+    if log:
+        try:
+            post_event("grok_reply", {"prompt": prompt, "reply": reply})
+        except Exception as e:
+            st.warning(f"n8n post failed: {e}")
+
+if st.button("Ask Grok", type="primary", use_container_width=True,
+             disabled=not bool(user_text.strip()) or job_pending("chat")):
+    prompt = user_text.strip()
     try:
-        reply = tools.grok_chat(user_text.strip())
-        st.success("Grok replied:")
-        st.write(reply)
-        if log_n8n:
-            try:
-                tools.n8n_post("grok_reply", {"prompt": user_text.strip(), "reply": reply})
-            except Exception as e:
-                st.warning(f"n8n post failed: {e}")
+        if USE_JOBS:
+            kwargs, conv_stats = conversation.prepare(SESSION_ID, prompt, mode=compaction, latency_class="auto")
+            submit_job("chat", "grok_chat", kwargs, label="Waiting for Grok", prompt=prompt,
+                       stats=conv_stats, log=log_n8n)
+        else:
+            with prewarm.first_action(SESSION_ID, "chat"):
+                reply, conv_stats = conversation.chat(SESSION_ID, prompt, mode=compaction, latency_class="auto")
+            _show_chat_reply(prompt, reply, conv_stats, log_n8n)
     except Exception as e:
         st.error(f"Grok error: {e}")
 
+if (done := finished_job("chat")) is not None:
+    job, ctx = done
+    if job["status"] == "error":
+        st.error(f"Grok error: {job['error']}")
+    else:
+        conversation.commit(SESSION_ID, ctx["prompt"], job["result"])
+        _show_chat_reply(ctx["prompt"], job["result"],
+                         {**ctx["stats"], "latency_s": round(job["finished"] - ctx["t0"], 3)}, ctx["log"])
+if job_pending("chat"):
+    jobs_panel("chat")
+
 st.divider()
 
 # ---- Transcribe Audio ----
@@ -129,39 +230,95 @@ st.header("Transcribe Audio")
 audio = st.file_uploader("Upload audio (aiff/wav/mp3/m4a)", type=["aiff", "wav", "mp3", "m4a"])
 auto_ask = st.checkbox("Ask Grok about the transcript", value=True)
 log_n8n2 = st.checkbox("Post to n8n", value=True, key="log2")
-
-if st.button("Transcribe", use_container_width=True, disabled=audio is None):
+with st.expander("Long-input mode"):
+    force_long = st.checkbox(
+        f"Always use map-reduce (auto above ~{summarize.LONG_INPUT_TOKENS} tokens)", value=False)
+    compare_mono = st.checkbox("Also time the single-prompt path (costs one extra call)", value=False)
+
+def _long_reply(words: list, txt: str, compare: bool) -> str:
+    """Map-reduce path for long transcripts; streams section summaries as they land."""
+    reply = ""
+    with st.status("Long transcript: summarising sections in parallel…", expanded=True) as status:
+        for ev in summarize.map_reduce(words, text=txt, compare_monolithic=compare):
+            if ev["stage"] == "plan":
+                status.update(label=f"Summarising {ev['chunks']} sections (~{ev['tokens']} tokens)…")
+            elif ev["stage"] == "map":
+                st.markdown(f"**[{summarize.span_label(ev)}]** {ev['summary']}")
+            elif ev["stage"] == "reduce":
+                status.update(label=f"Merging summaries (level {ev['level']})…")
+            elif ev["stage"] == "done":
+                reply = ev["summary"]
+                status.update(label=f"Done in {ev['stats']['wall_s']} s", state="complete", expanded=False)
+                st.json(ev["stats"])
+    return reply
+
+def _transcribe_inline(path: str) -> tuple[dict, dict]:
+    # Open the status first: transcribe_async compresses + uploads before it returns
+    with st.status("Compressing and uploading to AssemblyAI…", expanded=False) as stt_status:
+        job = voice.transcribe_async(path)
+        while not job.future.done():
+            stt_status.update(label=f"Transcribing ({job.status}) — {job.elapsed():.0f} s")
+            time.sleep(0.5)
+        res = job.future.result()
+        stt_status.update(label=f"Transcribed in {job.elapsed():.1f} s" + (f" via {job.via}" if job.via else ""),
+                          state="error" if "error" in res else "complete")
+    return res, job.upload
+
+def _show_transcript(res: dict, up: dict, source: str, log: bool) -> str:
+    """Upload stats, transcript, index + n8n post. Returns the transcript text ('' on error)."""
+    if up:
+        st.caption(
+            f"Upload: {up['sent_bytes'] / 1024:.0f} KB as {up['format']} "
+            f"(saved {up['saved_bytes'] / 1024:.0f} KB of {up['original_bytes'] / 1024:.0f} KB) "
+            f"in {up['upload_s']} s · {up['mode']}"
+        )
+    if "error" in res:
+        st.error(f"AssemblyAI error: {res['error']}")
+        return ""
+    txt = res.get("text", "").strip()
+    st.success("Transcript:")
+    st.write(txt)
+    index_safe(search_index.add_transcript, res, source=source, session=SESSION_ID)
+    if log:
+        try:
+            post_event("transcript_ready", {"text": txt, "confidence": res.get("confidence")})
+        except Exception as e:
+            st.warning(f"n8n post failed: {e}")
+    return txt
+
+def _show_transcript_reply(reply: str, txt: str, source: str, log: bool, conf):
+    st.info("Grok reply:")
+    st.write(reply)
+    index_safe(search_index.add_reply, reply, prompt=txt[:500], source=source, session=SESSION_ID)
+    if log:
+        try:
+            post_event("grok_reply_from_transcript", {"input_text": txt, "reply": reply, "stt_conf": conf})
+        except Exception as e:
+            st.warning(f"n8n post failed: {e}")
+
+if st.button("Transcribe", use_container_width=True, disabled=audio is None or job_pending("transcribe")
+             or job_pending("transcript_reply")):
     tmp_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{audio.name}") as tmp:
             tmp.write(audio.getbuffer())
             tmp_path = tmp.name
 
-        res = voice.transcribe_file(tmp_path)
-        if "error" in res:
-            st.error(f"AssemblyAI error: {res['error']}")
+        if USE_JOBS:
+            submit_job("transcribe", "transcribe", {}, label="Transcribing", path=tmp_path, source=audio.name,
+                       auto_ask=auto_ask, log=log_n8n2, long=force_long, compare=compare_mono)
         else:
-            txt = res.get("text", "").strip()
-            st.success("Transcript:")
-            st.write(txt)
-            if log_n8n2:
-                try:
-                    tools.n8n_post("transcript_ready", {"text": txt, "confidence": res.get("confidence")})
-                except Exception as e:
-                    st.warning(f"n8n post failed: {e}")
+            with prewarm.first_action(SESSION_ID, "transcribe"):
+                res, up = _transcribe_inline(tmp_path)
+            txt = _show_transcript(res, up, audio.name, log_n8n2)
             if auto_ask and txt:
                 try:
-                    reply = tools.grok_chat(f"You are Mind Fusion. Reply concisely to: {txt}")
-                    st.info("Grok reply:")
-                    st.write(reply)
-                    if log_n8n2:
-                        try:
-                            tools.n8n_post(
-                                "grok_reply_from_transcript",
-                                {"input_text": txt, "reply": reply, "stt_conf": res.get("confidence")},
-                            )
-                        except Exception as e:
-                            st.warning(f"n8n post failed: {e}")
+                    if force_long or summarize.is_long(txt):
+                        reply = _long_reply(res.get("words") or [], txt, compare_mono)
+                    else:
+                        reply = tools.grok_chat(f"You are Mind Fusion. Reply concisely to: {txt}",
+                                                latency_class="interactive")
+                    _show_transcript_reply(reply, txt, audio.name, log_n8n2, res.get("confidence"))
                 except Exception as e:
                     st.error(f"Grok error: {e}")
     finally:
@@ -171,6 +328,50 @@ if st.button("Transcribe", use_container_width=True, disabled=audio is None):
             except Exception:
                 pass
 
+# Worker-pool path: transcript first, then the reply (short prompt or map-reduce) as a second job
+if (done := finished_job("transcribe")) is not None:
+    job, ctx = done
+    if job["status"] == "error":
+        res, up = {"error": job["error"]}, {}
+    else:
+        res = job["result"]
+        res["words"] = WordTable.from_words(res.get("words"))
+        up = res.pop("upload", None) or {}
+        st.caption(f"Transcribed in {job['finished'] - ctx['t0']:.1f} s by {job['worker']}")
+    txt = _show_transcript(res, up, ctx["source"], ctx["log"])
+    if ctx["auto_ask"] and txt:
+        reply_ctx = {"txt": txt, "source": ctx["source"], "log": ctx["log"], "conf": res.get("confidence")}
+        try:
+            if ctx["long"] or summarize.is_long(txt):
+                submit_job("transcript_reply", "summarize",
+                           {"words": res["words"].to_list(), "text": txt, "compare_monolithic": ctx["compare"]},
+                           label="Long transcript: summarising sections", **reply_ctx)
+            else:
+                submit_job("transcript_reply", "grok_chat",
+                           {"prompt": f"You are Mind Fusion. Reply concisely to: {txt}",
+                            "latency_class": "interactive"},
+                           label="Waiting for Grok", **reply_ctx)
+        except Exception as e:
+            st.error(f"Grok error: {e}")
+if (done := finished_job("transcript_reply")) is not None:
+    job, ctx = done
+    with st.expander("Transcript", expanded=False):
+        st.write(ctx["txt"])
+    if job["status"] == "error":
+        st.error(f"Grok error: {job['error']}")
+    else:
+        reply = job["result"]
+        if isinstance(reply, dict):   # map-reduce result
+            with st.expander(f"{len(reply['sections'])} section summaries", expanded=False):
+                for sec in reply["sections"]:
+                    st.markdown(f"**[{sec['span']}]** {sec['summary']}")
+            st.json(reply["stats"])
+            reply = reply["summary"]
+        _show_transcript_reply(reply, ctx["txt"], ctx["source"], ctx["log"], ctx["conf"])
+for name in ("transcribe", "transcript_reply"):
+    if job_pending(name):
+        jobs_panel(name)
+
 st.divider()
 
 # ---- LiveKit Realtime ----
@@ -179,12 +380,13 @@ colA, colB = st.columns(2)
 with colA:
     room = st.text_input("Room name", value="mindfusion")
 with colB:
-    identity = st.text_input("Your identity", value=f"user-{uuid.uuid4().hex[:6]}")
+    identity = st.text_input("Your identity", value=st.session_state.gmf_identity)
 enabled = bool(LIVEKIT_API_KEY and LIVEKIT_API_SECRET and room.strip() and identity.strip())
 
 if st.button("Join Live Voice (beta)", disabled=not enabled, use_container_width=True):
     try:
-        info = tools.livekit_token(room.strip(), identity.strip(), name=identity.strip())
+        with prewarm.first_action(SESSION_ID, "livekit_join"):
+            info = prewarm.livekit_token(SESSION_ID, room.strip(), identity.strip(), name=identity.strip())
 
         # UMD build + robust global detection + visible logs
         html = f"""
@@ -213,24 +415,20 @@ if st.button("Join Live Voice (beta)", disabled=not enabled, use_container_width
     const statusEl = document.getElementById('status');
     const log = (...a) => {{ console.log(...a); logEl.textContent += a.join(' ') + "\\n"; }};
 
-    // Load UMD with fallback (unpkg → jsDelivr)
-    function loadUMD(callback) {{
+    // Load UMD with fallback, in prewarm.LIVEKIT_JS_URLS order (the URLs browser_hints() prefetched)
+    const UMD = {json.dumps(list(prewarm.LIVEKIT_JS_URLS))};
+    function loadUMD(callback, i = 0) {{
       if (window.Livekit || window.LiveKit || window.livekit) return callback();
-      const s1 = document.createElement('script');
-      s1.src = "https://unpkg.com/@livekit/client@2/dist/livekit-client.umd.min.js";
-      s1.crossOrigin = "anonymous"; s1.defer = true;
-      s1.onload = callback;
-      s1.onerror = () => {{
-        const s2 = document.createElement('script');
-        s2.src = "https://cdn.jsdelivr.net/npm/livekit-client@2/dist/livekit-client.umd.min.js";
-        s2.crossOrigin = "anonymous"; s2.defer = true;
-        s2.onload = callback;
-        s2.onerror = () => {{
-          statusEl.textContent = "ERROR: LiveKit UMD failed to load (unpkg + jsDelivr).";
-        }};
-        document.head.appendChild(s2);
-      }};
-      document.head.appendChild(s1);
+      if (i >= UMD.length) {{
+        statusEl.textContent = "ERROR: LiveKit UMD failed to load (" + UMD.join(", ") + ").";
+        return;
+      }}
+      const s = document.createElement('script');
+      s.src = UMD[i];
+      s.crossOrigin = "anonymous"; s.defer = true;   // same CORS mode as the prefetch, so it is reused
+      s.onload = callback;
+      s.onerror = () => loadUMD(callback, i + 1);
+      document.head.appendChild(s);
     }}
 
     loadUMD(async () => {{
@@ -295,15 +493,15 @@ st.divider()
 st.header("Builder (send spec to n8n)")
 col1, col2 = st.columns(2)
 with col1:
-    repo_name = st.text_input("Repository name", value="gmf-builder-demo").strip()
+    repo_name = st.text_input("Repository name(s)", value="gmf-builder-demo",
+                              help="Comma-separated names are sent together as one batch").strip()
 with col2:
     priority = st.selectbox("Priority", ["low", "normal", "high"], index=1)
 
 notes = st.text_input("Notes (optional)", placeholder="Design preferences, tech stack, etc.")
 readme = st.text_area("README content (optional)", height=120, placeholder="# Title\n\nShort description…")
 
-if st.button("Send Build Request", use_container_width=True, disabled=not bool(repo_name)):
-    ok, result = send_to_builder(repo_name, notes, priority, readme)
+def _show_builder_result(ok: bool, result):
     if ok:
         repo_url = (result or {}).get("repo_url") or "(pending)"
         st.success(f"Builder started successfully. Repo: {repo_url}")
@@ -314,4 +512,27 @@ if st.button("Send Build Request", use_container_width=True, disabled=not bool(r
         with st.expander("Error details"):
             st.code(json.dumps(result, indent=2) if isinstance(result, dict) else str(result))
 
-st.caption("GrokMind Fusion — cloud app. Secrets are stored in Streamlit Cloud Secrets.")
\ No newline at end of file
+specs = [{"repo_name": n.strip(), "notes": notes, "priority": priority, "readme": readme}
+         for n in repo_name.split(",") if n.strip()]
+if st.button("Send Build Request", use_container_width=True,
+             disabled=not specs or job_pending("builder")):
+    if USE_JOBS and (N8N_BUILDER_URL or N8N_BUILDER_BATCH_URL):
+        submit_job("builder", "builder", {"specs": specs, "url": N8N_BUILDER_URL,
+                                          "batch_url": N8N_BUILDER_BATCH_URL}, label="Builder request")
+    else:
+        for ok, result in send_to_builder(specs):
+            _show_builder_result(ok, result)
+
+if (done := finished_job("builder")) is not None:
+    job, _ctx = done
+    if job["status"] == "error":
+        _show_builder_result(False, job["error"])
+    else:
+        for r in job["result"]["results"]:
+            _show_builder_result(r["ok"], r["result"])
+if job_pending("builder"):
+    jobs_panel("builder")
+
+st.caption("GrokMind Fusion — cloud app. Secrets are stored in Streamlit Cloud Secrets.")
+
+profiling.end()
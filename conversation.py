@@ -0,0 +1,204 @@
+# conversation.py — GrokMind Fusion multi-turn memory
+# Per-SESSION_ID conversation store with a token budget per model. When history
+# grows past the budget the oldest turns are compacted — truncated, or folded into
+# a rolling summary computed in the background — so prompt size stays flat.
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import tools
+import usage
+import metrics
+
+# History budget (estimated tokens) per model; "*" is the fallback.
+# Override with GMF_CONTEXT_BUDGETS='{"grok-4": 12000, "*": 4000}'.
+DEFAULT_BUDGETS = {"grok-4": 8000, "*": 4000}
+HIGH_WATER = 0.9    # compact when history exceeds this share of the budget …
+LOW_WATER = 0.5     # … down to this share
+COMPACTION_MODES = ("summary", "truncate")
+# Store bounds: least recently used sessions beyond MAX_SESSIONS, or idle for TTL_S, are dropped
+MAX_SESSIONS = int(os.getenv("GMF_CONVERSATION_MAX_SESSIONS", "500"))
+TTL_S = float(os.getenv("GMF_CONVERSATION_TTL_S", str(6 * 3600)))
+
+SUMMARY_SYSTEM = ("You maintain a running summary of a conversation between a user and Mind Fusion. "
+                  "Merge the new turns into the existing summary. Keep facts, names, decisions, "
+                  "open questions and user preferences. Max ~200 words.")
+
+COMPACTIONS = metrics.counter("gmf_conversation_compactions_total", "History compactions", ("mode",))
+EVICTIONS = metrics.counter("gmf_conversation_evictions_total", "Conversations dropped from the store", ("reason",))
+
+_STORE: OrderedDict[str, "Conversation"] = OrderedDict()   # least recently used first
+_STORE_LOCK = threading.Lock()
+_SUMMARIZER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gmf-conv-summary")
+
+def budget_for(model: str | None) -> int:
+    try:
+        budgets = {**DEFAULT_BUDGETS, **json.loads(os.getenv("GMF_CONTEXT_BUDGETS", "{}"))}
+    except ValueError:
+        budgets = DEFAULT_BUDGETS
+    return int(budgets.get(model or tools.XAI_MODEL, budgets["*"]))
+
+@dataclass
+class Conversation:
+    session_id: str
+    turns: list[dict] = field(default_factory=list)   # {role, content, tokens}
+    summary: str = ""                                  # rolling summary of compacted turns
+    summarized_turns: int = 0
+    dropped_turns: int = 0
+    pending: bool = False                              # background summary in flight
+    used: float = field(default_factory=time.time)     # last get(), for LRU/TTL eviction
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def history_tokens(self) -> int:
+        return sum(t["tokens"] for t in self.turns) + tools.estimate_tokens(self.summary)
+
+def get(session_id: str) -> Conversation:
+    with _STORE_LOCK:
+        conv = _STORE.get(session_id)
+        if conv is None:
+            conv = _STORE[session_id] = Conversation(session_id)
+            _evict()
+        else:
+            _STORE.move_to_end(session_id)
+        conv.used = time.time()
+    return conv
+
+def _evict():
+    """Called with _STORE_LOCK held: drop idle and least recently used conversations."""
+    now = time.time()
+    while _STORE:
+        oldest = next(iter(_STORE.values()))
+        if now - oldest.used > TTL_S:
+            reason = "ttl"
+        elif len(_STORE) > MAX_SESSIONS:
+            reason = "lru"
+        else:
+            return
+        _STORE.popitem(last=False)
+        EVICTIONS.inc(reason=reason)
+
+def reset(session_id: str):
+    with _STORE_LOCK:
+        _STORE.pop(session_id, None)
+
+# ---------------------------
+# Chat turn
+# ---------------------------
+def chat(session_id: str, prompt: str, *, model: str | None = None, system: str | None = None,
+         mode: str = "summary", temperature: float = 0.2, call=None,
+         latency_class: str | None = None) -> tuple[str, dict]:
+    """
+    One conversational turn through tools.grok_chat with compacted history.
+    call: optional stand-in with grok_chat's signature.
+    latency_class: passed to the tools.py model router (interactive for voice turns).
+    Returns (reply, stats); stats describe the prompt that was actually sent.
+    """
+    kwargs, stats = prepare(session_id, prompt, model=model, system=system, mode=mode,
+                            temperature=temperature, latency_class=latency_class)
+    t0 = time.perf_counter()
+    reply = (call or tools.grok_chat)(**kwargs)
+    stats["latency_s"] = round(time.perf_counter() - t0, 3)
+    commit(session_id, prompt, reply)
+    return reply, stats
+
+def prepare(session_id: str, prompt: str, *, model: str | None = None, system: str | None = None,
+            mode: str = "summary", temperature: float = 0.2,
+            latency_class: str | None = None) -> tuple[dict, dict]:
+    """
+    First half of chat() for callers that send the turn elsewhere (e.g. a jobs.py
+    grok_chat job polled across reruns). Returns (grok_chat kwargs, stats); pass the
+    reply to commit() once it arrives.
+    """
+    if mode not in COMPACTION_MODES:
+        raise ValueError(f"Unknown compaction mode: {mode}")
+    conv = get(session_id)
+    with conv.lock:
+        # The router may send the turn to any model in its chain: budget for the smallest context
+        models = _models_for(model, latency_class,
+                             conv.history_tokens() + tools.estimate_tokens((system or "") + prompt))
+        budget = min(budget_for(m) for m in models)
+        compacted = _compact(conv, budget, mode, model)
+        history = [{"role": t["role"], "content": t["content"]} for t in conv.turns]
+        sys_msg = system or ""
+        if conv.summary:
+            sys_msg = (sys_msg + "\n\n" if sys_msg else "") + f"Summary of the earlier conversation:\n{conv.summary}"
+        stats = {
+            "model": models[0],                     # expected; the router may fall back along the chain
+            "model_chain": models,
+            "budget_tokens": budget,
+            "history_turns": len(conv.turns),
+            "summary_tokens": tools.estimate_tokens(conv.summary),
+            "prompt_tokens_est": tools.estimate_tokens(sys_msg) + sum(t["tokens"] for t in conv.turns)
+                                 + tools.estimate_tokens(prompt),
+            "compaction": mode,
+            "compacted_now": compacted,
+            "summarized_total": conv.summarized_turns,
+            "dropped_total": conv.dropped_turns,
+            "summary_pending": conv.pending,
+        }
+    kwargs = {"prompt": prompt, "model": model, "system": sys_msg or None, "history": history,
+              "temperature": temperature, "latency_class": latency_class}
+    return kwargs, stats
+
+def _models_for(model: str | None, latency_class: str | None, prompt_tokens: int) -> list[str]:
+    """Models tools.grok_chat may use for this turn: the pinned model, or the router's chain."""
+    if model or not latency_class:
+        return [model or tools.XAI_MODEL]
+    return tools.route(prompt_tokens, latency_class)[1]
+
+def commit(session_id: str, prompt: str, reply: str):
+    """Append a finished user/assistant turn (second half of chat())."""
+    conv = get(session_id)
+    with conv.lock:
+        conv.turns.append({"role": "user", "content": prompt, "tokens": tools.estimate_tokens(prompt)})
+        conv.turns.append({"role": "assistant", "content": reply, "tokens": tools.estimate_tokens(reply)})
+
+# ---------------------------
+# Compaction
+# ---------------------------
+def _compact(conv: Conversation, budget: int, mode: str, model: str | None) -> int:
+    """Called with conv.lock held. Returns the number of turns compacted this call."""
+    if conv.history_tokens() <= budget * HIGH_WATER:
+        return 0
+    target = budget * LOW_WATER
+    cut = 0
+    total = conv.history_tokens()
+    # Keep user/assistant pairs together: cut on even boundaries
+    while cut + 2 <= len(conv.turns) - 2 and total > target:
+        total -= conv.turns[cut]["tokens"] + conv.turns[cut + 1]["tokens"]
+        cut += 2
+    if not cut:
+        return 0
+    old, conv.turns = conv.turns[:cut], conv.turns[cut:]
+    COMPACTIONS.inc(mode=mode)
+    if mode == "truncate" or conv.pending:
+        # Summary already in flight: drop rather than queue an unbounded backlog
+        conv.dropped_turns += len(old)
+        return len(old)
+    conv.pending = True
+    _SUMMARIZER.submit(usage.carry(_fold_into_summary), conv, old, model)
+    return len(old)
+
+def _fold_into_summary(conv: Conversation, old: list[dict], model: str | None):
+    with conv.lock:
+        prev = conv.summary
+    transcript = "\n".join(f"{t['role']}: {t['content']}" for t in old)
+    prompt = f"Existing summary:\n{prev or '(none)'}\n\nNew turns:\n{transcript}"
+    try:
+        summary = tools.grok_chat(prompt, system=SUMMARY_SYSTEM, model=model, latency_class="batch")
+    except Exception:
+        summary = None
+    with conv.lock:
+        if summary:
+            conv.summary = summary
+            conv.summarized_turns += len(old)
+        else:
+            conv.dropped_turns += len(old)
+        conv.pending = False
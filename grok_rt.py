@@ -24,7 +24,7 @@ def stream_reply(prompt: str, *, chunk_ms: int = 40) -> Generator[str, None, Non
         text = f"(tools import failed: {_TOOLS_ERR}) You said: {prompt.strip()}"
     else:
         try:
-            text = tools.grok_chat(prompt.strip())
+            text = tools.grok_chat(prompt.strip(), latency_class="interactive")
         except Exception as e:
             text = f"(Grok error: {e}) You said: {prompt.strip()}"
 
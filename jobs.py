@@ -0,0 +1,335 @@
+# jobs.py — GrokMind Fusion out-of-process job queue
+# SQLite-backed queue drained by a pool of worker processes, so Streamlit reruns
+# never block on upstream calls. Pages submit() and poll() each rerun; workers run
+# anywhere that can open the same DB file (GMF_JOBS_DB) and audio dir (GMF_JOBS_DIR).
+#
+#   python jobs.py worker --procs 4      # start a local worker pool
+#   python jobs.py stats                 # queue depth by status
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing as mp
+
+DB_PATH = os.getenv("GMF_JOBS_DB", "gmf_jobs.db")
+FILES_DIR = os.getenv("GMF_JOBS_DIR", "gmf_jobs_files")
+LEASE_S = float(os.getenv("GMF_JOBS_LEASE_S", "900"))     # running jobs not heartbeated for this long are requeued
+HEARTBEAT_S = min(30.0, LEASE_S / 3)                         # workers push the lease forward this often
+CLAIM_TIMEOUT_S = float(os.getenv("GMF_JOBS_CLAIM_TIMEOUT_S", "30"))   # queued this long with no worker activity = no workers
+RUN_TIMEOUT_S = float(os.getenv("GMF_JOBS_RUN_TIMEOUT_S", "300"))      # default wait for run()
+MAX_ATTEMPTS = int(os.getenv("GMF_JOBS_MAX_ATTEMPTS", "2"))
+ENABLED = os.getenv("GMF_JOBS", "") not in ("", "0", "false")   # pages route heavy calls here
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    payload  TEXT NOT NULL,
+    status   TEXT NOT NULL DEFAULT 'queued',   -- queued | running | done | error
+    result   TEXT,
+    error    TEXT,
+    session  TEXT,
+    worker   TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created  REAL NOT NULL,
+    started  REAL,                             -- claim time, pushed forward by the worker heartbeat
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs(status, created);
+"""
+
+_local = threading.local()
+
+def _conn() -> sqlite3.Connection:
+    con = getattr(_local, "con", None)
+    # Never reuse a connection across fork() or after DB_PATH changes
+    if con is None or getattr(_local, "key", None) != (DB_PATH, os.getpid()):
+        con = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)   # autocommit; explicit BEGIN
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.executescript(_SCHEMA)
+        _local.con, _local.key = con, (DB_PATH, os.getpid())
+    return con
+
+# ---------------------------
+# Client side (Streamlit pages)
+# ---------------------------
+def submit(kind: str, payload: dict, *, session: str | None = None) -> str:
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    import usage
+    job_id = uuid.uuid4().hex
+    payload = {**payload, "_scope": {**usage.current(), **({"session": session} if session else {})}}
+    _conn().execute(
+        "INSERT INTO jobs(id, kind, payload, session, created) VALUES (?,?,?,?,?)",
+        (job_id, kind, json.dumps(payload), session, time.time()),
+    )
+    return job_id
+
+def submit_file(kind: str, path: str, payload: dict | None = None, *, session: str | None = None) -> str:
+    """Copy a local file into the shared jobs dir (workers may be other hosts) and submit."""
+    os.makedirs(FILES_DIR, exist_ok=True)
+    dest = os.path.join(FILES_DIR, f"{uuid.uuid4().hex}_{os.path.basename(path)}")
+    shutil.copyfile(path, dest)
+    return submit(kind, {**(payload or {}), "path": os.path.abspath(dest), "owned_file": True}, session=session)
+
+def get(job_id: str) -> dict | None:
+    row = _conn().execute(
+        "SELECT id, kind, status, result, error, worker, attempts, created, started, finished FROM jobs WHERE id=?",
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    keys = ("id", "kind", "status", "result", "error", "worker", "attempts", "created", "started", "finished")
+    job = dict(zip(keys, row))
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+def cancel(job_id: str, reason: str = "cancelled") -> bool:
+    """Fail a job no worker has claimed yet. Returns False if it is already running or finished."""
+    cur = _conn().execute(
+        "UPDATE jobs SET status='error', error=?, finished=? WHERE id=? AND status='queued'",
+        (reason, time.time(), job_id),
+    )
+    return cur.rowcount > 0
+
+def poll(job_id: str, *, claim_timeout: float | None = None) -> dict:
+    """
+    Non-blocking status check for pages (call it from a st.fragment(run_every=…)).
+    A job still queued after claim_timeout (default CLAIM_TIMEOUT_S) is cancelled and
+    comes back as an error, but only if no worker has claimed, heartbeated or finished
+    anything in that window either: busy workers just mean a longer queue.
+    """
+    job = get(job_id)
+    if job is None:
+        raise KeyError(job_id)
+    limit = CLAIM_TIMEOUT_S if claim_timeout is None else claim_timeout
+    if job["status"] == "queued" and time.time() - job["created"] > limit and not _workers_seen(limit):
+        cancel(job_id, f"no worker claimed the job within {limit:g}s (is `python jobs.py worker` running?)")
+        job = get(job_id)   # error now, or running if a worker won the race
+    return job
+
+def _workers_seen(within: float) -> bool:
+    """Any worker activity recently? Running jobs heartbeat `started` every HEARTBEAT_S."""
+    since = time.time() - max(within, 2 * HEARTBEAT_S)
+    row = _conn().execute(
+        "SELECT 1 FROM jobs WHERE (status='running' AND started > ?) "
+        "OR (worker IS NOT NULL AND finished > ?) LIMIT 1",
+        (since, since),
+    ).fetchone()
+    return row is not None
+
+def wait(job_id: str, timeout: float | None = None, *, poll_s: float = 0.2, on_poll=None,
+         claim_timeout: float | None = None) -> dict:
+    """
+    Poll until the job is done/error. on_poll(job) is called each tick (UI progress).
+    Returns the job dict (an error if no worker claimed it in time); raises TimeoutError.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    delay = poll_s
+    while True:
+        job = poll(job_id, claim_timeout=claim_timeout)
+        if job["status"] in ("done", "error"):
+            return job
+        if on_poll:
+            on_poll(job)
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
+
+def run(kind: str, payload: dict, *, timeout: float | None = RUN_TIMEOUT_S, session: str | None = None):
+    """
+    Submit and wait; returns the handler result or raises RuntimeError with the worker error.
+    Blocks the caller — pages should submit() and poll() instead.
+    """
+    job = wait(submit(kind, payload, session=session), timeout)
+    if job["status"] == "error":
+        raise RuntimeError(job["error"])
+    return job["result"]
+
+def stats() -> dict:
+    rows = _conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+    return dict(rows)
+
+# ---------------------------
+# Handlers (run inside worker processes)
+# ---------------------------
+def _grok_chat(p: dict):
+    import tools
+    return tools.grok_chat(p["prompt"], model=p.get("model"), temperature=p.get("temperature", 0.2),
+                           system=p.get("system"), history=p.get("history"),
+                           latency_class=p.get("latency_class"))
+
+def _transcribe(p: dict):
+    import voice
+    try:
+        job = voice.transcribe_async(p["path"])
+        res = job.future.result(p.get("timeout"))
+    finally:
+        if p.get("owned_file"):
+            try:
+                os.remove(p["path"])
+            except OSError:
+                pass
+    if "error" in res:
+        raise RuntimeError(res["error"])
+    return {**res, "words": res["words"].to_list(), "upload": job.upload}
+
+def _summarize(p: dict):
+    import summarize
+    sections, done = [], None
+    for ev in summarize.map_reduce(p.get("words"), text=p.get("text", ""),
+                                   compare_monolithic=p.get("compare_monolithic", False)):
+        if ev["stage"] == "map":
+            sections.append({"span": summarize.span_label(ev), "summary": ev["summary"]})
+        elif ev["stage"] == "done":
+            done = ev
+    if done is None:
+        raise RuntimeError("nothing to summarise")
+    return {"summary": done["summary"], "stats": done["stats"], "sections": sections}
+
+def _n8n_post(p: dict):
+    import tools
+    return tools.n8n_post(p["event"], p.get("data"))
+
+def _builder(p: dict):
+    import tools
+    if "specs" in p:   # several specs: one envelope to the batch Builder workflow
+        results = tools.send_to_builder_batch(p["specs"], url=p.get("batch_url"), single_url=p.get("url"))
+        return {"results": [{"ok": ok, "result": result} for ok, result in results]}
+    ok, result = tools.send_to_builder(p["repo_name"], p.get("notes", ""), p.get("priority", "normal"),
+                                       p.get("readme", ""), url=p.get("url"))
+    return {"ok": ok, "result": result}
+
+HANDLERS = {
+    "grok_chat": _grok_chat,
+    "transcribe": _transcribe,
+    "summarize": _summarize,
+    "n8n_post": _n8n_post,
+    "builder": _builder,
+}
+
+# ---------------------------
+# Worker side
+# ---------------------------
+def claim(worker: str) -> tuple[str, str, dict] | None:
+    """Atomically take the oldest queued job (and requeue expired leases)."""
+    con = _conn()
+    now = time.time()
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        con.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'error' ELSE 'queued' END, "
+            "error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END "
+            "WHERE status='running' AND started < ?",
+            (MAX_ATTEMPTS, MAX_ATTEMPTS, now - LEASE_S),
+        )
+        row = con.execute(
+            "SELECT id, kind, payload FROM jobs WHERE status='queued' ORDER BY created LIMIT 1"
+        ).fetchone()
+        if row is None:
+            con.execute("COMMIT")
+            return None
+        con.execute(
+            "UPDATE jobs SET status='running', worker=?, started=?, attempts=attempts+1 WHERE id=?",
+            (worker, now, row[0]),
+        )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return row[0], row[1], json.loads(row[2])
+
+def _finish(job_id: str, worker: str, *, result=None, error: str | None = None) -> bool:
+    """Record the outcome only while this worker still holds the lease (False: requeued or reclaimed)."""
+    cur = _conn().execute(
+        "UPDATE jobs SET status=?, result=?, error=?, finished=? WHERE id=? AND worker=? AND status='running'",
+        ("error" if error else "done", None if error else json.dumps(result, default=str), error,
+         time.time(), job_id, worker),
+    )
+    return cur.rowcount > 0
+
+def _heartbeat(job_id: str, worker: str, stop: threading.Event):
+    """Push the lease forward while the handler runs; long transcriptions outlive LEASE_S."""
+    while not stop.wait(HEARTBEAT_S):
+        try:
+            cur = _conn().execute(
+                "UPDATE jobs SET started=? WHERE id=? AND worker=? AND status='running'",
+                (time.time(), job_id, worker),
+            )
+        except sqlite3.Error:
+            continue    # DB busy; next beat
+        if cur.rowcount == 0:
+            return      # lease lost
+
+def work_forever(worker: str, *, idle_max_s: float = 1.0, stop: threading.Event | None = None):
+    """Single worker loop: claim, run, record (until `stop` is set). Idle polling backs off to idle_max_s."""
+    import usage
+    idle = 0.05
+    while stop is None or not stop.is_set():
+        job = claim(worker)
+        if job is None:
+            if stop is not None:
+                stop.wait(idle)
+            else:
+                time.sleep(idle)
+            idle = min(idle * 2, idle_max_s)
+            continue
+        idle = 0.05
+        job_id, kind, payload = job
+        beat_stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(job_id, worker, beat_stop), daemon=True)
+        beat.start()
+        try:
+            with usage.scope(**payload.pop("_scope", {})):   # bill the submitting session/page
+                result = HANDLERS[kind](payload)
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        else:
+            error = None
+        finally:
+            beat_stop.set()
+            beat.join()
+        _finish(job_id, worker, result=result, error=error)
+
+def _worker_main(n: int):
+    try:
+        work_forever(f"{socket.gethostname()}:{os.getpid()}:{n}")
+    except KeyboardInterrupt:
+        pass
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="GrokMind Fusion job workers")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("worker", help="run a pool of worker processes")
+    w.add_argument("--procs", type=int, default=int(os.getenv("GMF_JOBS_PROCS", os.cpu_count() or 2)))
+    sub.add_parser("stats", help="queue depth by status")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "stats":
+        print(json.dumps(stats()))
+        return
+    _conn()  # create schema before forking
+    procs = [mp.Process(target=_worker_main, args=(i,), daemon=True) for i in range(args.procs)]
+    for p in procs:
+        p.start()
+    print(f"{args.procs} workers on {DB_PATH} (Ctrl-C to stop)")
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
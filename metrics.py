@@ -0,0 +1,278 @@
+# metrics.py — GrokMind Fusion metrics registry
+# Counters, gauges and fixed-bucket histograms (Prometheus text format),
+# plus a tiny HTTP endpoint that runs in a side thread of the Streamlit process.
+
+from __future__ import annotations
+
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Default latency buckets (seconds): 10 ms … 2 min, covers Grok + AssemblyAI + n8n
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_REGISTRY: dict[str, "_Metric"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+# ---------------------------
+# Metric types
+# ---------------------------
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        # Missing labels become "" so a typo never raises on the hot path
+        return tuple(str(labels.get(k, "")) for k in self.labels)
+
+    def _fmt_labels(self, key: tuple, extra: str = "") -> str:
+        parts = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(key, val) for key, val in self._values.items()]
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{self._fmt_labels(k)} {_num(v)}" for k, v in self.samples()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    samples = Counter.samples
+    render = Counter.render
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe wall time of the block. Sets labels['outcome'] to ok/error if declared."""
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if "outcome" in self.labels and "outcome" not in labels:
+                labels["outcome"] = outcome
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self):
+        with self._lock:
+            return [(key, (list(st[0]), st[1], st[2])) for key, st in self._values.items()]
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Estimate a quantile from bucket counts (linear interpolation, like histogram_quantile)."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if not state or not state[2]:
+                return None
+            counts, total = list(state[0]), state[2]
+        return _bucket_quantile(self.buckets, counts, total, q)
+
+    def render(self) -> list[str]:
+        out = []
+        for key, (counts, total_sum, count) in self.samples():
+            cum = 0
+            for le, c in zip(self.buckets, counts):
+                cum += c
+                le_label = 'le="' + _num(le) + '"'
+                out.append(f"{self.name}_bucket{self._fmt_labels(key, le_label)} {cum}")
+            inf_label = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{self._fmt_labels(key, inf_label)} {count}")
+            out.append(f"{self.name}_sum{self._fmt_labels(key)} {_num(total_sum)}")
+            out.append(f"{self.name}_count{self._fmt_labels(key)} {count}")
+        return out
+
+# ---------------------------
+# Registry (get-or-create, safe across Streamlit reruns)
+# ---------------------------
+def _get_or_create(cls, name: str, help: str, labels, **kw):
+    m = _REGISTRY.get(name)
+    if m is not None:
+        return m
+    with _REGISTRY_LOCK:
+        m = _REGISTRY.get(name)
+        if m is None:
+            m = _REGISTRY[name] = cls(name, help, tuple(labels), **kw)
+    return m
+
+def counter(name: str, help: str = "", labels=()) -> Counter:
+    return _get_or_create(Counter, name, help, labels)
+
+def gauge(name: str, help: str = "", labels=()) -> Gauge:
+    return _get_or_create(Gauge, name, help, labels)
+
+def histogram(name: str, help: str = "", labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, help, labels, buckets=tuple(buckets))
+
+def cache_lookup(cache: str, hit: bool):
+    """
+    Record a cache hit/miss; the Metrics page derives hit ratios from these. Instrumented:
+    xai_client (tools._client), livekit_token (prewarmed token reuse).
+    """
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+CACHE_LOOKUPS = counter("gmf_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+
+def render() -> str:
+    """Prometheus text exposition (format 0.0.4) of every registered metric."""
+    lines = []
+    for name in sorted(_REGISTRY):
+        m = _REGISTRY[name]
+        lines.append(f"# HELP {name} {m.help}")
+        lines.append(f"# TYPE {name} {m.kind}")
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+def snapshot() -> list[dict]:
+    """Flat rows for UI rendering: one row per metric/label set."""
+    rows = []
+    for name in sorted(_REGISTRY):
+        m = _REGISTRY[name]
+        for key, val in m.samples():
+            row = {"metric": name, "type": m.kind, **dict(zip(m.labels, key))}
+            if m.kind == "histogram":
+                counts, total_sum, count = val
+                row.update({
+                    "count": count,
+                    "mean_s": round(total_sum / count, 4) if count else None,
+                    "p50_s": _round(_bucket_quantile(m.buckets, counts, count, 0.50)),
+                    "p95_s": _round(_bucket_quantile(m.buckets, counts, count, 0.95)),
+                    "p99_s": _round(_bucket_quantile(m.buckets, counts, count, 0.99)),
+                })
+            else:
+                row["value"] = val
+            rows.append(row)
+    return rows
+
+# ---------------------------
+# HTTP endpoint (side thread)
+# ---------------------------
+_SERVER: ThreadingHTTPServer | None = None
+_SERVER_LOCK = threading.Lock()
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # keep Streamlit logs clean
+        pass
+
+def serve(port: int | None = None, host: str | None = None) -> int | None:
+    """
+    Start the /metrics endpoint once per process (idempotent across reruns).
+    Port from GMF_METRICS_PORT (default 9108; 0 disables). Returns the bound port or None.
+    """
+    global _SERVER
+    if _SERVER is not None:
+        return _SERVER.server_address[1]
+    if port is None:
+        port = int(os.getenv("GMF_METRICS_PORT", "9108") or 0)
+    if port <= 0:
+        return None
+    host = host or os.getenv("GMF_METRICS_HOST", "0.0.0.0")
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            try:
+                srv = ThreadingHTTPServer((host, port), _Handler)
+            except OSError as e:
+                print(f"(warn) metrics endpoint not started on :{port}: {e}")
+                return None
+            srv.daemon_threads = True
+            threading.Thread(target=srv.serve_forever, name="gmf-metrics", daemon=True).start()
+            _SERVER = srv
+    return _SERVER.server_address[1]
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _bucket_quantile(buckets, counts, total, q: float) -> float | None:
+    if not total:
+        return None
+    rank = q * total
+    cum = 0
+    lower = 0.0
+    for i, c in enumerate(counts):
+        upper = buckets[i] if i < len(buckets) else None
+        if cum + c >= rank and c:
+            if upper is None:  # +Inf bucket: best we can say is "above the top bucket"
+                return buckets[-1] if buckets else None
+            return lower + (upper - lower) * ((rank - cum) / c)
+        cum += c
+        if upper is not None:
+            lower = upper
+    return buckets[-1] if buckets else None
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _num(v: float) -> str:
+    return repr(int(v)) if float(v).is_integer() else repr(float(v))
+
+def _round(v):
+    return round(v, 4) if v is not None else None
@@ -0,0 +1,54 @@
+# pages/Dev Profiling.py
+# GrokMind Fusion — developer view of per-rerun profiles (only active with GMF_PROFILE set)
+
+from __future__ import annotations
+
+import streamlit as st
+
+import profiling
+
+st.set_page_config(page_title="Dev Profiling", layout="wide")
+st.title("🔬 Dev Profiling")
+
+if not profiling.ENABLED:
+    st.info("Profiling is off. Start Streamlit with `GMF_PROFILE=sample` (low overhead) "
+            "or `GMF_PROFILE=cprofile` (deterministic) to record script reruns.")
+    st.stop()
+
+runs = profiling.runs()
+st.caption(f"Mode: `{profiling.MODE}` · keeping last {profiling.KEEP} runs · {len(runs)} recorded"
+           + (f" · {profiling.skipped()} skipped (concurrent cProfile)" if profiling.skipped() else ""))
+
+colA, colB = st.columns([1, 1])
+with colA:
+    st.download_button("⬇️ Download all runs (JSON)", profiling.export_json(),
+                       file_name="gmf-profiles.json", mime="application/json", use_container_width=True)
+with colB:
+    if st.button("Clear ring buffer", use_container_width=True):
+        profiling.clear()
+        st.rerun()
+
+if not runs:
+    st.info("No runs yet — interact with the app or Voice Mode page, then refresh.")
+    st.stop()
+
+st.dataframe([r.summary() for r in runs], use_container_width=True, hide_index=True)
+
+labels = {f"#{r.seq} {r.script} ({r.summary()['wall_ms']} ms)": r for r in runs}
+run = labels[st.selectbox("Run", list(labels))]
+
+if run.stats is not None:
+    st.subheader("Top functions (self time)")
+    st.dataframe(profiling.top_n(run, 40), use_container_width=True, hide_index=True)
+    with st.expander("pstats (cumulative)"):
+        st.code(profiling.pstats_text(run), language="text")
+    st.download_button("⬇️ Download .prof (pstats / snakeviz)", profiling.pstats_bytes(run),
+                       file_name=f"gmf-run-{run.seq}.prof", mime="application/octet-stream")
+else:
+    by = st.radio("Group by", ["function", "line"], horizontal=True)
+    st.subheader("Top frames")
+    st.dataframe(profiling.top_n(run, 40, by=by), use_container_width=True, hide_index=True)
+    st.subheader("Flame graph (icicle)")
+    st.components.v1.html(profiling.flame_html(run), height=420, scrolling=True)
+    st.download_button("⬇️ Download collapsed stacks (speedscope / flamegraph.pl)", profiling.collapsed(run),
+                       file_name=f"gmf-run-{run.seq}.folded", mime="text/plain")
@@ -0,0 +1,83 @@
+# pages/Metrics.py
+# GrokMind Fusion — live view of the in-process metrics registry (same data as /metrics)
+
+from __future__ import annotations
+
+import streamlit as st
+
+import metrics
+import tools  # registers Grok / n8n / LiveKit metrics; routing decisions
+import voice  # noqa: F401  (registers AssemblyAI metrics)
+import prewarm
+import usage
+
+st.set_page_config(page_title="Metrics", layout="wide")
+st.title("📈 Metrics")
+
+port = metrics.serve()
+st.caption(f"Prometheus endpoint: `:{port}/metrics`" if port else "Prometheus endpoint disabled (GMF_METRICS_PORT=0 or port busy).")
+
+refresh = st.select_slider("Refresh every (s)", options=[1, 2, 5, 10, 30], value=5)
+
+def _cache_ratios(rows: list[dict]) -> list[dict]:
+    by_cache: dict[str, dict] = {}
+    for r in rows:
+        if r["metric"] == "gmf_cache_lookups_total":
+            by_cache.setdefault(r.get("cache", ""), {"hit": 0.0, "miss": 0.0})[r.get("result", "miss")] += r["value"]
+    out = []
+    for cache, c in sorted(by_cache.items()):
+        total = c["hit"] + c["miss"]
+        out.append({"cache": cache, "lookups": int(total), "hit_ratio": round(c["hit"] / total, 3) if total else None})
+    return out
+
+@st.fragment(run_every=refresh)
+def live_metrics():
+    rows = metrics.snapshot()
+    hist = [r for r in rows if r["type"] == "histogram"]
+    other = [r for r in rows if r["type"] != "histogram"]
+
+    st.subheader("Latency histograms")
+    if hist:
+        st.dataframe(hist, use_container_width=True, hide_index=True)
+    else:
+        st.info("No upstream calls recorded yet in this process.")
+
+    st.subheader("Counters & gauges")
+    if other:
+        st.dataframe(other, use_container_width=True, hide_index=True)
+
+    first = [r for r in prewarm.report() if r["n_yes"] or r["n_no"]]
+    if first:
+        st.subheader("First-action latency: prewarmed vs cold")
+        st.dataframe(first, use_container_width=True, hide_index=True)
+
+    routes = tools.recent_routes(50)
+    if routes:
+        st.subheader("Model routing")
+        by_cls = [r for r in hist if r["metric"] == "gmf_grok_route_seconds"]
+        if by_cls:
+            st.dataframe(by_cls, use_container_width=True, hide_index=True)
+        with st.expander("Recent routing decisions"):
+            st.dataframe([{**r, "attempts": " → ".join(f"{a['model']} {a['s']}s{'' if a['ok'] else ' ✗'}"
+                                                      for a in r["attempts"])} for r in routes],
+                         use_container_width=True, hide_index=True)
+
+    try:
+        top = usage.top_sessions(10)
+    except Exception:
+        top = []
+    if top:
+        st.subheader("Top sessions by cost")
+        st.dataframe(top, use_container_width=True, hide_index=True)
+        with st.expander("Cost by page and kind"):
+            st.dataframe(usage.breakdown(by=("page", "kind", "model")), use_container_width=True, hide_index=True)
+
+    ratios = _cache_ratios(rows)
+    if ratios:
+        st.subheader("Cache hit ratios")
+        st.dataframe(ratios, use_container_width=True, hide_index=True)
+
+    with st.expander("Raw exposition"):
+        st.code(metrics.render(), language="text")
+
+live_metrics()
@@ -0,0 +1,50 @@
+# pages/Search.py
+# GrokMind Fusion — full-text search over stored transcripts and Grok replies
+
+from __future__ import annotations
+
+import time
+import streamlit as st
+
+import search_index
+
+st.set_page_config(page_title="Search", layout="centered")
+st.title("🔎 Search transcripts & replies")
+
+def clock(ms) -> str:
+    if ms is None:
+        return "—"
+    s = int(ms // 1000)
+    return f"{s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}" if s >= 3600 else f"{s // 60}:{s % 60:02d}"
+
+q = st.text_input("Query", placeholder='e.g. deadline, "livekit room", budg*').strip()
+colA, colB, colC = st.columns([1, 1, 1])
+with colA:
+    kind = st.selectbox("Type", ["all", "transcript", "reply"])
+with colB:
+    limit = st.number_input("Max hits", 5, 200, 20, step=5)
+with colC:
+    mine = st.checkbox("This session only", value=False)
+
+if q:
+    res = search_index.search(
+        q, limit=int(limit), kind=None if kind == "all" else kind,
+        session=st.session_state.get("gmf_session_id") if mine else None,
+    )
+    if res.get("error"):
+        st.error(res["error"])
+    note = " · ranked within newest matches" if res.get("capped") else ""
+    st.caption(f"{len(res['hits'])} hits in {res['elapsed_ms']} ms{note}")
+    for h in res["hits"]:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(h["created"]))
+        at = ", ".join(f"{m['word']} @ {clock(m['start'])}" for m in h["matches"] if m["start"] is not None)
+        st.markdown(
+            f"**{h['kind']}** · `{h['source'] or '—'}` · {when}"
+            + (f" · {clock(h['segment_start'])}–{clock(h['segment_end'])}" if h["segment_start"] is not None else "")
+        )
+        st.markdown(f"> {h['snippet']}")
+        if at:
+            st.caption(f"Word hits: {at}")
+
+with st.expander("Index stats"):
+    st.json(search_index.stats())
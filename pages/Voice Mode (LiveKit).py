@@ -8,8 +8,16 @@ import time
 import uuid
 import streamlit as st
 
+import profiling
+profiling.begin("Voice Mode (LiveKit).py")
+
 # Local deps
 import tools  # grok_chat, livekit_token, n8n_post
+import conversation
+import search_index
+import jobs
+import prewarm
+import usage
 
 # ---------------------------
 # Session logger (robust import + shims)
@@ -49,6 +57,11 @@ _ensure_session()
 SESSION     = st.session_state.gmf_session      # dict
 SESSION_ID  = st.session_state.gmf_session_id   # string
 
+usage.bind(session=SESSION_ID, page="voice_mode")
+
+# Background prewarm for the default room/identity below (no-op if app.py already started it)
+prewarm.start(SESSION_ID, page="voice_mode", room="mindfusion", identity="user")
+
 def log_event_safe(event: str, **data):
     try:
         slog.log_event(SESSION_ID, event, **data)
@@ -67,6 +80,7 @@ def flush_events_safe():
 st.set_page_config(page_title="Voice Mode (LiveKit)", layout="centered")
 st.title("🎙️ Voice Mode (LiveKit)")
 st.caption(f"Session: `{SESSION_ID}`")
+st.components.v1.html(prewarm.browser_hints(), height=0)   # fetch the LiveKit JS before "Launch"
 
 # ---------------------------
 # Inputs
@@ -100,7 +114,9 @@ st.subheader("Join room")
 
 if st.button("🚀 Launch Voice (inline)", use_container_width=True):
     try:
-        info = tools.livekit_token(room or "mindfusion", identity or "user", name=identity or "user")
+        with prewarm.first_action(SESSION_ID, "livekit_join"):
+            info = prewarm.livekit_token(SESSION_ID, room or "mindfusion", identity or "user",
+                                         name=identity or "user")
         log_event_safe("livekit_token_ok", room=room, identity=identity)
     except Exception as e:
         log_event_safe("livekit_token_err", error=str(e))
@@ -158,11 +174,8 @@ if st.button("🚀 Launch Voice (inline)", use_container_width=True):
   const badgeMic  = document.getElementById('mic');
   const log = (...a) => {{ console.log(...a); status.textContent += "\\n" + a.join(" "); }};
 
-  // Try UMD then ESM
-  const UMD = [
-    "https://cdn.jsdelivr.net/npm/livekit-client@2/dist/livekit-client.umd.min.js",
-    "https://unpkg.com/livekit-client@2/dist/livekit-client.umd.min.js"
-  ];
+  // Try UMD (the URLs browser_hints() prefetched) then ESM
+  const UMD = {json.dumps(list(prewarm.LIVEKIT_JS_URLS))};
   const ESM = [
     "https://cdn.jsdelivr.net/npm/livekit-client@2/dist/livekit-client.esm.js",
     "https://unpkg.com/livekit-client@2/dist/livekit-client.esm.js",
@@ -172,7 +185,8 @@ if st.button("🚀 Launch Voice (inline)", use_container_width=True):
   function loadScript(src) {{
     return new Promise((resolve, reject) => {{
       const s = document.createElement('script');
-      s.src = src; s.onload = () => resolve(src); s.onerror = () => reject(new Error('script failed: ' + src));
+      s.src = src; s.crossOrigin = "anonymous";   // match the prefetch's CORS mode
+      s.onload = () => resolve(src); s.onerror = () => reject(new Error('script failed: ' + src));
       document.head.appendChild(s);
     }});
   }}
@@ -272,8 +286,9 @@ user_msg = st.text_area(
 )
 
 colL, colR = st.columns([1, 1])
-speak_btn     = colL.button("Send to Grok → Speak reply", type="primary", use_container_width=True)
-just_text_btn = colR.button("Send to Grok (text only)", use_container_width=True)
+_busy = bool(st.session_state.get("gmf_voice_job"))   # a queued turn is still being polled
+speak_btn     = colL.button("Send to Grok → Speak reply", type="primary", use_container_width=True, disabled=_busy)
+just_text_btn = colR.button("Send to Grok (text only)", use_container_width=True, disabled=_busy)
 
 def speak_in_browser(text: str):
     # Mobile-safe TTS: needs a user tap to unlock audio on iOS/Safari.
@@ -305,14 +320,40 @@ def send_to_grok_and_show(prompt: str, speak: bool):
         return
     try:
         log_event_safe("grok_ask", text=msg)
-        reply = tools.grok_chat(msg)
+        if jobs.ENABLED:
+            # Worker pool: queue the turn and let voice_job_panel poll it, so reruns never block
+            kwargs, conv_stats = conversation.prepare(SESSION_ID, msg, latency_class="interactive")
+            st.session_state.gmf_voice_job = {
+                "id": jobs.submit("grok_chat", kwargs, session=SESSION_ID),
+                "t0": time.time(), "prompt": msg, "stats": conv_stats, "speak": speak,
+            }
+            return
+        with prewarm.first_action(SESSION_ID, "chat"):
+            reply, conv_stats = conversation.chat(SESSION_ID, msg, latency_class="interactive")
+        show_reply(msg, reply, conv_stats, speak)
+    except Exception as e:
+        st.error(f"Grok error: {e}")
+        log_event_safe("grok_err", error=str(e))
+
+def show_reply(msg: str, reply: str, conv_stats: dict, speak: bool):
+    try:
         st.success("Grok reply")
         st.write(reply)
-        log_event_safe("grok_reply", text=reply)
+        st.caption(f"~{conv_stats['prompt_tokens_est']} tokens · {conv_stats['history_turns']} turns in context · "
+                   f"compacted {conv_stats['compacted_now']}")
+        log_event_safe("grok_reply", text=reply, compaction=conv_stats)
+        try:
+            search_index.add_reply(reply, prompt=msg, source="voice_mode", session=SESSION_ID)
+        except Exception:
+            pass
 
         # Best-effort n8n post (logging pipeline may already capture via session_log)
         try:
-            tools.n8n_post("voice_demo_grok", {"session": SESSION_ID, "prompt": msg, "reply": reply})
+            data = {"session": SESSION_ID, "prompt": msg, "reply": reply}
+            if jobs.ENABLED:
+                jobs.submit("n8n_post", {"event": "voice_demo_grok", "data": data}, session=SESSION_ID)
+            else:
+                tools.n8n_post("voice_demo_grok", data)
         except Exception:
             pass
 
@@ -322,12 +363,39 @@ def send_to_grok_and_show(prompt: str, speak: bool):
         st.error(f"Grok error: {e}")
         log_event_safe("grok_err", error=str(e))
 
+@st.fragment(run_every=1.0)
+def voice_job_panel():
+    pending = st.session_state.get("gmf_voice_job")
+    if pending is None:
+        return
+    try:
+        job = jobs.poll(pending["id"])
+    except KeyError:
+        job = {"status": "error", "error": "job vanished from the queue", "worker": None}
+    if job["status"] in ("done", "error"):
+        st.session_state.gmf_voice_job = None
+        st.session_state.gmf_voice_done = (job, pending)
+        st.rerun()
+    st.info(f"⏳ Waiting for Grok — {job['status']} for {time.time() - pending['t0']:.0f} s")
+
 if speak_btn:
     send_to_grok_and_show(user_msg, speak=True)
 if just_text_btn:
     send_to_grok_and_show(user_msg, speak=False)
+if (done := st.session_state.pop("gmf_voice_done", None)) is not None:
+    job, pending = done
+    if job["status"] == "error":
+        st.error(f"Grok error: {job['error']}")
+        log_event_safe("grok_err", error=job["error"])
+    else:
+        conversation.commit(SESSION_ID, pending["prompt"], job["result"])
+        show_reply(pending["prompt"], job["result"], pending["stats"], pending["speak"])
+if st.session_state.get("gmf_voice_job"):
+    voice_job_panel()
 
 st.caption("Tip: On iPhone, tap the blue button to play Grok’s reply (browser audio unlock).")
 
 # Flush any buffered session events (safe no-op if shimmed)
-flush_events_safe()
\ No newline at end of file
+flush_events_safe()
+
+profiling.end()
\ No newline at end of file
@@ -0,0 +1,237 @@
+# prewarm.py — GrokMind Fusion speculative prewarming
+# When a session starts (app.py load / Voice Mode page) pay the cold costs in the
+# background before the first click: heavy imports (openai, assemblyai, soundfile),
+# TLS + keep-alive connections to xAI and AssemblyAI, a LiveKit token for the default
+# room, and — within a global hourly budget — one tiny warm-up completion. Pages also
+# emit <link rel=preconnect/prefetch> hints so the browser fetches the LiveKit JS early.
+#
+# First-action latency (chat / transcribe / livekit_join) is recorded per session as
+# gmf_first_action_seconds{action, prewarmed}; GMF_PREWARM_HOLDOUT keeps a share of
+# sessions cold so the two can be compared on the Metrics page.
+#
+#   GMF_PREWARM=0                          disable
+#   GMF_PREWARM_HOLDOUT=0.1                fraction of sessions left cold (comparison group)
+#   GMF_PREWARM_COMPLETIONS_PER_HOUR=10    warm-up completions allowed per process per hour (0 = none)
+
+from __future__ import annotations
+
+import os
+import time
+import zlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import metrics
+
+ENABLED = os.getenv("GMF_PREWARM", "1") not in ("0", "false")
+HOLDOUT = float(os.getenv("GMF_PREWARM_HOLDOUT", "0"))
+COMPLETIONS_PER_HOUR = int(os.getenv("GMF_PREWARM_COMPLETIONS_PER_HOUR", "10"))
+TOKEN_MAX_AGE_S = 1800          # reuse a prewarmed LiveKit token for half its 1 h TTL
+SESSION_TTL_S = 6 * 3600        # forget sessions (and unused tokens) after this
+MAX_SESSIONS = 1000
+DEFAULT_ROOM = "mindfusion"
+ACTIONS = ("chat", "transcribe", "livekit_join")
+
+# LiveKit client UMD builds, in the order the pages' loaders try them (browser_hints() prefetches these)
+LIVEKIT_JS_URLS = (
+    "https://cdn.jsdelivr.net/npm/livekit-client@2/dist/livekit-client.umd.min.js",
+    "https://unpkg.com/livekit-client@2/dist/livekit-client.umd.min.js",
+)
+
+FIRST_ACTION = metrics.histogram("gmf_first_action_seconds", "Latency of the first action in a session",
+                                 ("action", "prewarmed"))
+STEP_SECONDS = metrics.histogram("gmf_prewarm_step_seconds", "Background prewarm step time", ("step", "outcome"))
+SKIPPED = metrics.counter("gmf_prewarm_skipped_total", "Prewarm steps not run", ("step", "reason"))
+
+@dataclass
+class Session:
+    id: str
+    page: str
+    prewarmed: bool
+    started: float = field(default_factory=time.time)
+    steps: dict[str, dict] = field(default_factory=dict)       # step -> {status, s}
+    tokens: dict[tuple[str, str], tuple[dict, float]] = field(default_factory=dict)
+    first_done: set[str] = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+_SESSIONS: dict[str, Session] = {}     # insertion order = start order, oldest first
+_SESSIONS_LOCK = threading.Lock()
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gmf-prewarm")
+
+# Global warm-up completion budget (sliding one-hour window across all sessions)
+_spent: list[float] = []
+_spent_lock = threading.Lock()
+
+def _take_completion_budget() -> bool:
+    now = time.time()
+    with _spent_lock:
+        _spent[:] = [t for t in _spent if now - t < 3600]
+        if len(_spent) >= COMPLETIONS_PER_HOUR:
+            return False
+        _spent.append(now)
+        return True
+
+def _in_holdout(session_id: str) -> bool:
+    return HOLDOUT > 0 and (zlib.crc32(session_id.encode()) % 1000) < HOLDOUT * 1000
+
+# ---------------------------
+# Steps (each runs once per session, in the background pool)
+# ---------------------------
+def _imports(_sess: Session):
+    import openai  # noqa: F401
+    import voice   # noqa: F401  (assemblyai, soundfile via upload.py)
+
+def _xai_connection(_sess: Session):
+    import tools
+    if not os.getenv("XAI_API_KEY"):
+        raise LookupError("XAI_API_KEY not set")
+    tools._client().models.list()          # free GET; leaves a TLS keep-alive connection in the pool
+
+def _aai_connection(_sess: Session):
+    import voice
+    import upload
+    import assemblyai as aai
+    voice._aai_ready()                     # raises if ASSEMBLYAI_API_KEY is missing
+    # Both pools: upload.py's session (uploads) and the SDK's client (submit / poll)
+    upload.warm(aai.settings.base_url, aai.settings.api_key)
+    aai.Client.get_default().http_client.get("/v2/transcript", params={"limit": 1})
+
+def _livekit_token(sess: Session, room: str, identity: str):
+    import tools
+    if not (os.getenv("LIVEKIT_API_KEY") and os.getenv("LIVEKIT_API_SECRET")):
+        raise LookupError("LiveKit keys not set")
+    info = tools.livekit_token(room, identity, name=identity)
+    with sess.lock:
+        sess.tokens[(room, identity)] = (info, time.time())
+
+def _grok_warmup(sess: Session):
+    import tools
+    if not os.getenv("XAI_API_KEY"):
+        raise LookupError("XAI_API_KEY not set")
+    if not _take_completion_budget():
+        raise PermissionError("hourly warm-up budget spent")
+    import usage
+    resp = tools._client().chat.completions.create(
+        model=tools.XAI_MODEL, messages=[{"role": "user", "content": "ping"}], max_tokens=1,
+    )
+    u = getattr(resp, "usage", None)
+    usage.record("grok", tools.XAI_MODEL, scope={"session": sess.id, "page": "prewarm"},
+                 prompt_tokens=getattr(u, "prompt_tokens", 0) or 0,
+                 completion_tokens=getattr(u, "completion_tokens", 0) or 0)
+
+def _run_step(sess: Session, name: str, fn, *args):
+    t0 = time.perf_counter()
+    try:
+        fn(sess, *args)
+        status = "ok"
+    except (LookupError, PermissionError) as e:
+        status = f"skipped: {e}"
+        SKIPPED.inc(step=name, reason="budget" if isinstance(e, PermissionError) else "unconfigured")
+    except Exception as e:
+        status = f"error: {e}"
+    elapsed = time.perf_counter() - t0
+    if status == "ok" or status.startswith("error"):
+        STEP_SECONDS.observe(elapsed, step=name, outcome="ok" if status == "ok" else "error")
+    with sess.lock:
+        sess.steps[name] = {"status": status, "s": round(elapsed, 3)}
+
+# ---------------------------
+# Public API
+# ---------------------------
+def start(session_id: str, *, page: str, room: str = DEFAULT_ROOM, identity: str = "user") -> Session:
+    """
+    Kick off background prewarming for a new session (idempotent across reruns and pages).
+    Returns immediately; nothing here blocks the script thread.
+    """
+    sess = _SESSIONS.get(session_id)
+    if sess is not None:
+        return sess
+    with _SESSIONS_LOCK:
+        sess = _SESSIONS.get(session_id)
+        if sess is not None:
+            return sess
+        _evict()
+        sess = _SESSIONS[session_id] = Session(session_id, page, prewarmed=ENABLED and not _in_holdout(session_id))
+    if not sess.prewarmed:
+        SKIPPED.inc(step="all", reason="disabled" if not ENABLED else "holdout")
+        return sess
+
+    def run():
+        # Imports first: the connection steps need the modules anyway
+        _run_step(sess, "imports", _imports)
+        for name, fn, args in (("xai_connection", _xai_connection, ()),
+                               ("aai_connection", _aai_connection, ()),
+                               ("livekit_token", _livekit_token, (room, identity))):
+            _POOL.submit(_run_step, sess, name, fn, *args)
+        if COMPLETIONS_PER_HOUR > 0:
+            _run_step(sess, "grok_warmup", _grok_warmup)
+
+    _POOL.submit(run)
+    return sess
+
+def _evict():
+    """Called with _SESSIONS_LOCK held: drop expired sessions and keep at most MAX_SESSIONS."""
+    now = time.time()
+    for sid in list(_SESSIONS):
+        if now - _SESSIONS[sid].started <= SESSION_TTL_S and len(_SESSIONS) < MAX_SESSIONS:
+            break
+        del _SESSIONS[sid]
+
+def get(session_id: str) -> Session | None:
+    return _SESSIONS.get(session_id)
+
+def livekit_token(session_id: str, room: str, identity: str, name: str | None = None) -> dict:
+    """tools.livekit_token, served from the session's prewarmed token when room/identity match."""
+    import tools
+    sess = _SESSIONS.get(session_id)
+    if sess is not None:
+        with sess.lock:
+            cached = sess.tokens.pop((room, identity), None)
+        if cached and time.time() - cached[1] < TOKEN_MAX_AGE_S and (name or identity) == identity:
+            metrics.cache_lookup("livekit_token", True)
+            return cached[0]
+    metrics.cache_lookup("livekit_token", False)
+    return tools.livekit_token(room, identity, name=name)
+
+@contextmanager
+def first_action(session_id: str, action: str):
+    """Time a block; if it is this session's first `action`, record it under prewarmed=yes/no."""
+    sess = _SESSIONS.get(session_id)
+    if sess is None or action in sess.first_done:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        with sess.lock:
+            first = action not in sess.first_done
+            sess.first_done.add(action)
+        if first:
+            FIRST_ACTION.observe(time.perf_counter() - t0, action=action,
+                                 prewarmed="yes" if sess.prewarmed else "no")
+
+def report() -> list[dict]:
+    """First-action latency with vs without prewarming, one row per action."""
+    counts = {key: val[2] for key, val in FIRST_ACTION.samples()}
+    rows = []
+    for action in ACTIONS:
+        row = {"action": action}
+        for pw in ("yes", "no"):
+            row[f"n_{pw}"] = counts.get((action, pw), 0)
+            for q in (0.5, 0.95):
+                v = FIRST_ACTION.quantile(q, action=action, prewarmed=pw)
+                row[f"p{int(q * 100)}_{pw}_s"] = round(v, 3) if v is not None else None
+        rows.append(row)
+    return rows
+
+def browser_hints() -> str:
+    """HTML for a zero-height component: preconnect to every CDN, prefetch the URL loaders try first."""
+    links = []
+    for url in LIVEKIT_JS_URLS:
+        origin = "/".join(url.split("/", 3)[:3])
+        links.append(f'<link rel="preconnect" href="{origin}" crossorigin>')
+    links.append(f'<link rel="prefetch" href="{LIVEKIT_JS_URLS[0]}" as="script" crossorigin>')
+    return "\n".join(links)
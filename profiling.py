@@ -0,0 +1,271 @@
+# profiling.py — GrokMind Fusion per-rerun profiling (opt-in)
+# Streamlit re-executes each script top to bottom on every interaction; this wraps
+# each run in a sampling (default) or deterministic (cProfile) profiler and keeps
+# the last N run profiles in a process-wide ring buffer for the Dev Profiling page.
+#
+#   GMF_PROFILE=sample | cprofile   (unset/empty = off, "1" = sample)
+#   GMF_PROFILE_KEEP=20             (ring buffer size)
+#   GMF_PROFILE_INTERVAL_MS=5       (sampling period)
+#
+# cProfile mode profiles one run at a time (from Python 3.12 the profiler is
+# process-global); runs that start while another is being profiled are skipped.
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+import json
+import time
+import html
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+MODE = {"1": "sample", "true": "sample"}.get(os.getenv("GMF_PROFILE", "").lower(), os.getenv("GMF_PROFILE", "").lower())
+ENABLED = MODE in ("sample", "cprofile")
+KEEP = int(os.getenv("GMF_PROFILE_KEEP", "20"))
+INTERVAL_S = float(os.getenv("GMF_PROFILE_INTERVAL_MS", "5")) / 1000.0
+
+_RUNS: deque["RunProfile"] = deque(maxlen=KEEP)
+_ACTIVE: dict[int, "_Active"] = {}   # script thread id -> in-flight run
+_LOCK = threading.Lock()
+_SEQ = 0
+_SKIPPED = 0                         # cprofile runs not profiled because another was in flight
+
+@dataclass
+class RunProfile:
+    seq: int
+    script: str
+    mode: str
+    started: float
+    wall_s: float = 0.0
+    truncated: bool = False           # run ended by st.stop()/exception before end()
+    samples: Counter = field(default_factory=Counter)   # collapsed stack -> count (sample mode)
+    stats: dict | None = None         # pstats raw dict (cprofile mode)
+
+    def summary(self) -> dict:
+        return {
+            "seq": self.seq,
+            "script": self.script,
+            "mode": self.mode,
+            "started": time.strftime("%H:%M:%S", time.localtime(self.started)),
+            "wall_ms": round(self.wall_s * 1000, 1),
+            "samples": sum(self.samples.values()) if self.samples else None,
+            "truncated": self.truncated,
+        }
+
+@dataclass
+class _Active:
+    run: RunProfile
+    t0: float
+    thread: threading.Thread
+    last: float = 0.0                 # perf_counter of the last sample that saw the thread running
+    stop: threading.Event | None = None
+    sampler: threading.Thread | None = None
+    prof: cProfile.Profile | None = None
+
+# ---------------------------
+# Run lifecycle (call begin() at the top of a script, end() at the bottom)
+# ---------------------------
+def begin(script: str):
+    """Start profiling this script run. No-op unless GMF_PROFILE is set."""
+    global _SEQ, _SKIPPED
+    if not ENABLED:
+        return
+    tid = threading.get_ident()
+    _reap(tid)
+    with _LOCK:
+        if MODE == "cprofile" and _ACTIVE:
+            _SKIPPED += 1
+            return
+        _SEQ += 1
+        seq = _SEQ
+    run = RunProfile(seq=seq, script=script, mode=MODE, started=time.time())
+    act = _Active(run=run, t0=time.perf_counter(), thread=threading.current_thread())
+    if MODE == "cprofile":
+        act.prof = cProfile.Profile()
+        act.prof.enable()
+    else:
+        act.stop = threading.Event()
+        act.sampler = threading.Thread(target=_sample_loop, args=(tid, act, act.stop),
+                                       name="gmf-profiler", daemon=True)
+        act.sampler.start()
+    _ACTIVE[tid] = act
+
+def _reap(tid: int):
+    """
+    Close runs that never reached end() (st.stop() or an exception): the previous run on
+    this thread, and runs whose ScriptRunner thread has exited — Streamlit starts a new
+    thread per run, so those would otherwise never be closed (or be closed much later
+    if CPython reuses the thread id).
+    """
+    for t, act in list(_ACTIVE.items()):
+        # is_alive() is per Thread object, so a reused thread id does not keep a dead run open
+        if t == tid or not act.thread.is_alive():
+            _finish(t, truncated=True)
+
+def end():
+    """Finish the current thread's run and push it into the ring buffer."""
+    if ENABLED:
+        _finish(threading.get_ident(), truncated=False)
+
+def _finish(tid: int, *, truncated: bool):
+    act = _ACTIVE.pop(tid, None)
+    if act is None:
+        return
+    run = act.run
+    run.truncated = truncated
+    if act.prof is not None:
+        act.prof.disable()
+        act.prof.create_stats()
+        run.stats = act.prof.stats
+    if not truncated:
+        run.wall_s = time.perf_counter() - act.t0
+    elif run.stats is not None:
+        # The run stopped at an unknown time: use the profiled time, not the gap until now
+        run.wall_s = sum(tt for _cc, _nc, tt, _ct, _callers in run.stats.values())
+    else:
+        run.wall_s = max(act.last - act.t0, 0.0)
+    if act.stop is not None:
+        act.stop.set()
+        act.sampler.join(timeout=1.0)
+    with _LOCK:
+        _RUNS.append(run)
+
+def _sample_loop(tid: int, act: _Active, stop: threading.Event):
+    samples = act.run.samples
+    while not stop.wait(INTERVAL_S):
+        frame = sys._current_frames().get(tid)
+        if frame is None:
+            return
+        act.last = time.perf_counter()
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        samples[";".join(reversed(stack))] += 1
+
+# ---------------------------
+# Read side (Dev Profiling page)
+# ---------------------------
+def runs() -> list[RunProfile]:
+    with _LOCK:
+        return list(reversed(_RUNS))
+
+def clear():
+    with _LOCK:
+        _RUNS.clear()
+
+def skipped() -> int:
+    """cProfile runs skipped because another run was being profiled."""
+    return _SKIPPED
+
+def top_n(run: RunProfile, n: int = 25, *, by: str = "function") -> list[dict]:
+    """
+    Top-N hot spots. by="function" groups frames by file+function; by="line" keeps
+    line numbers (useful for script-level code like inline f-string HTML templates).
+    """
+    if run.stats is not None:
+        st = pstats.Stats(_StatsHolder(run.stats))
+        rows = []
+        for (fn, line, func), (cc, nc, tt, ct, _callers) in st.stats.items():  # type: ignore[attr-defined]
+            label = f"{func} ({os.path.basename(fn)}:{line})"
+            rows.append({"frame": label, "calls": nc, "self_ms": round(tt * 1000, 2), "total_ms": round(ct * 1000, 2)})
+        rows.sort(key=lambda r: r["self_ms"], reverse=True)
+        return rows[:n]
+
+    total = sum(run.samples.values()) or 1
+    self_c: Counter = Counter()
+    incl_c: Counter = Counter()
+    for stack, count in run.samples.items():
+        frames = [_group(f, by) for f in stack.split(";")]
+        self_c[frames[-1]] += count
+        for f in set(frames):
+            incl_c[f] += count
+    ms_per = run.wall_s * 1000 / total
+    return [
+        {"frame": f, "self_pct": round(100 * c / total, 1), "total_pct": round(100 * incl_c[f] / total, 1),
+         "self_ms≈": round(c * ms_per, 1)}
+        for f, c in self_c.most_common(n)
+    ]
+
+def collapsed(run: RunProfile) -> str:
+    """Brendan Gregg collapsed-stack text (flamegraph.pl / speedscope)."""
+    return "\n".join(f"{stack} {count}" for stack, count in run.samples.most_common()) + "\n"
+
+def pstats_bytes(run: RunProfile) -> bytes:
+    """marshal-ed pstats dump (pstats.Stats / snakeviz can load it)."""
+    return marshal.dumps(run.stats or {})
+
+def pstats_text(run: RunProfile, n: int = 40) -> str:
+    buf = io.StringIO()
+    pstats.Stats(_StatsHolder(run.stats or {}), stream=buf).sort_stats("cumulative").print_stats(n)
+    return buf.getvalue()
+
+def export_json() -> str:
+    """Whole ring buffer as JSON, for offline diffing between builds."""
+    out = []
+    for run in runs():
+        item = run.summary()
+        if run.samples:
+            item["collapsed"] = dict(run.samples)
+        if run.stats is not None:
+            item["top"] = top_n(run, 200)
+        out.append(item)
+    return json.dumps(out, indent=1)
+
+def flame_html(run: RunProfile, *, min_pct: float = 0.5) -> str:
+    """Self-contained HTML icicle graph (root on top) built from sampled stacks."""
+    tree: dict = {"n": 0, "c": {}}
+    for stack, count in run.samples.items():
+        node = tree
+        node["n"] += count
+        for f in stack.split(";"):
+            node = node["c"].setdefault(f, {"n": 0, "c": {}})
+            node["n"] += count
+    total = tree["n"] or 1
+
+    def render(children: dict, depth: int) -> str:
+        parts = []
+        for name, node in sorted(children.items(), key=lambda kv: -kv[1]["n"]):
+            pct = 100 * node["n"] / total
+            if pct < min_pct:
+                continue
+            hue = 20 + (hash(name.split(" (")[0]) % 40)
+            label = html.escape(name)
+            parts.append(
+                f'<div class="f" style="flex:{node["n"]} 1 0">'
+                f'<div class="l" style="background:hsl({hue},85%,{62 - min(depth, 10)}%)" '
+                f'title="{label} — {pct:.1f}%">{label}</div>'
+                f'<div class="k">{render(node["c"], depth + 1)}</div></div>'
+            )
+        return "".join(parts)
+
+    return f"""
+<style>
+  .k {{ display:flex; width:100%; }}
+  .f {{ min-width:0; display:flex; flex-direction:column; }}
+  .l {{ font:11px/16px monospace; height:16px; overflow:hidden; white-space:nowrap;
+        text-overflow:ellipsis; border:1px solid #fff; padding:0 2px; color:#111; }}
+</style>
+<div class="k">{render(tree["c"], 0)}</div>
+"""
+
+def _group(frame: str, by: str) -> str:
+    if by == "line":
+        return frame
+    name, _, loc = frame.partition(" (")
+    return f"{name} ({loc.rsplit(':', 1)[0]})" if loc else name
+
+class _StatsHolder:
+    """Minimal object pstats.Stats accepts (it calls create_stats() and reads .stats)."""
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
@@ -6,6 +6,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+import search_index
+import summarize
 import tools
 import voice
 
@@ -18,13 +20,31 @@ def mac_say(text: str):
     except Exception as e:
         print(f"(warn) say failed: {e}")
 
+def long_reply(words: list, text: str) -> str:
+    """Map-reduce path for long recordings; prints section summaries as they complete."""
+    reply = ""
+    for ev in summarize.map_reduce(words, text=text):
+        if ev["stage"] == "plan":
+            print(f"   long input: {ev['chunks']} sections (~{ev['tokens']} tokens)")
+        elif ev["stage"] == "map":
+            print(f"   [{summarize.span_label(ev)}] {ev['summary'][:120]}")
+        elif ev["stage"] == "done":
+            reply = ev["summary"]
+            print("   stats:", json.dumps(ev["stats"]))
+    return reply
+
 def main():
     if not AUDIO_IN.exists():
         print(f"(error) input file not found: {AUDIO_IN.resolve()}")
         sys.exit(1)
 
     print("1) Transcribing audio…")
-    tr = voice.transcribe_file(str(AUDIO_IN))
+    job = voice.transcribe_async(str(AUDIO_IN))
+    tr = job.future.result()
+    if job.upload:
+        up = job.upload
+        print(f"   upload: {up['original_bytes']} -> {up['sent_bytes']} bytes ({up['format']}), "
+              f"saved {up['saved_bytes']}, {up['upload_s']} s")
     if "error" in tr:
         print("AssemblyAI error:", tr["error"])
         sys.exit(2)
@@ -33,16 +53,26 @@ def main():
     conf = tr.get("confidence")
     print("   transcript:", text)
     print("   confidence:", conf)
+    try:
+        search_index.add_transcript(tr, source=AUDIO_IN.name)
+    except Exception as e:
+        print("   (warn) search index failed:", e)
 
     print("\n2) Asking Grok for a concise reply…")
-    prompt = f"You are Mind Fusion. Reply concisely to: {text}"
     try:
-        reply = tools.grok_chat(prompt)
+        if summarize.is_long(text):
+            reply = long_reply(tr.get("words") or [], text)
+        else:
+            reply = tools.grok_chat(f"You are Mind Fusion. Reply concisely to: {text}", latency_class="interactive")
     except Exception as e:
         print("Grok error:", e)
         sys.exit(3)
 
     print("   grok reply:", reply)
+    try:
+        search_index.add_reply(reply, prompt=text, source=AUDIO_IN.name)
+    except Exception as e:
+        print("   (warn) search index failed:", e)
 
     print("\n3) Speaking the reply…")
     mac_say(reply)
@@ -0,0 +1,275 @@
+# search_index.py — GrokMind Fusion local full-text search
+# SQLite FTS5 index over transcripts and Grok replies, built incrementally.
+# Text is indexed in short word segments; each hit maps back to the word-level
+# start/end timestamps (ms) from voice.transcribe_file.
+#
+#   GMF_INDEX_DB=gmf_index.db   (path to the SQLite file)
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+DB_PATH = os.getenv("GMF_INDEX_DB", "gmf_index.db")
+SEGMENT_WORDS = 32   # words per indexed segment (hits are located inside a segment)
+MAX_CANDIDATES = int(os.getenv("GMF_INDEX_MAX_CANDIDATES", "5000"))  # rank only the newest N matches
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id       INTEGER PRIMARY KEY,
+    kind     TEXT NOT NULL,          -- transcript | reply
+    source   TEXT,                   -- file name / page / event
+    session  TEXT,
+    created  REAL NOT NULL,
+    meta     TEXT                    -- JSON (confidence, prompt, …)
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id       INTEGER PRIMARY KEY,    -- = segments_fts.rowid
+    doc_id   INTEGER NOT NULL REFERENCES docs(id) ON DELETE CASCADE,
+    seq      INTEGER NOT NULL,
+    start_ms INTEGER,
+    end_ms   INTEGER,
+    timings  TEXT                    -- JSON [[start, end], …] per word, or NULL
+);
+CREATE INDEX IF NOT EXISTS segments_doc ON segments(doc_id, seq);
+"""
+# tags holds kind/session tokens (see _tags) so search filters run inside the FTS index
+_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, tags, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_local = threading.local()
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def _conn(path: str | None = None) -> sqlite3.Connection:
+    """One connection per thread (Streamlit runs each session on its own thread)."""
+    path = path or DB_PATH
+    cache = getattr(_local, "conns", None)
+    if cache is None:
+        cache = _local.conns = {}
+    con = cache.get(path)
+    if con is None:
+        con = sqlite3.connect(path, timeout=10)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA foreign_keys=ON")
+        con.executescript(_SCHEMA + _FTS)
+        _migrate(con)
+        cache[path] = con
+    return con
+
+def _tags(kind: str | None, session: str | None) -> str:
+    """One FTS token per filter value (hex keeps ids with '-' etc. a single token)."""
+    return " ".join(f"{p}{v.encode().hex()}" for p, v in (("k", kind), ("s", session)) if v)
+
+def _migrate(con: sqlite3.Connection):
+    """Indexes built before the tags column: rebuild segments_fts once (text only lives there)."""
+    if "tags" in [r[1] for r in con.execute("PRAGMA table_info(segments_fts)")]:
+        return
+    con.create_function("gmf_tags", 2, _tags)
+    con.execute("BEGIN")
+    try:
+        con.execute("ALTER TABLE segments_fts RENAME TO segments_fts_old")
+        con.execute(_FTS)
+        con.execute(
+            "INSERT INTO segments_fts(rowid, text, tags) SELECT o.rowid, o.text, gmf_tags(d.kind, d.session)"
+            " FROM segments_fts_old o JOIN segments s ON s.id = o.rowid JOIN docs d ON d.id = s.doc_id"
+        )
+        con.execute("DROP TABLE segments_fts_old")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+# ---------------------------
+# Ingest
+# ---------------------------
+def add_transcript(result: dict, *, source: str = "", session: str | None = None,
+                   db: str | None = None) -> int | None:
+    """Index a voice.transcribe_file result ({text, confidence, words[]}). Returns doc id."""
+    words = list(result.get("words") or [])
+    if not words:
+        return add_text(result.get("text") or "", kind="transcript", source=source, session=session,
+                        meta={"confidence": result.get("confidence")}, db=db)
+    return _add(kind="transcript", source=source, session=session,
+                meta={"confidence": result.get("confidence")}, words=words, db=db)
+
+def add_reply(text: str, *, prompt: str | None = None, source: str = "", session: str | None = None,
+              db: str | None = None) -> int | None:
+    """Index a Grok reply (no timings; hits carry start/end = None)."""
+    return add_text(text, kind="reply", source=source, session=session,
+                    meta={"prompt": (prompt or "")[:500]}, db=db)
+
+def add_text(text: str, *, kind: str, source: str = "", session: str | None = None,
+             meta: dict | None = None, db: str | None = None) -> int | None:
+    return _add(kind=kind, source=source, session=session, meta=meta,
+                words=[{"text": t} for t in text.split()], db=db)
+
+def _add(*, kind, source, session, meta, words, db) -> int | None:
+    if not words:
+        return None
+    con = _conn(db)
+    with con:
+        cur = con.execute(
+            "INSERT INTO docs(kind, source, session, created, meta) VALUES (?,?,?,?,?)",
+            (kind, source, session, time.time(), json.dumps(meta or {})),
+        )
+        doc_id = cur.lastrowid
+        tags = _tags(kind, session)
+        for seq, i in enumerate(range(0, len(words), SEGMENT_WORDS)):
+            seg = words[i:i + SEGMENT_WORDS]
+            timed = seg[0].get("start") is not None
+            timings = json.dumps([[w.get("start"), w.get("end")] for w in seg], separators=(",", ":")) if timed else None
+            cur = con.execute(
+                "INSERT INTO segments(doc_id, seq, start_ms, end_ms, timings) VALUES (?,?,?,?,?)",
+                (doc_id, seq, seg[0].get("start"), seg[-1].get("end"), timings),
+            )
+            con.execute("INSERT INTO segments_fts(rowid, text, tags) VALUES (?,?,?)",
+                        (cur.lastrowid, " ".join(w.get("text") or "" for w in seg), tags))
+    return doc_id
+
+def delete_doc(doc_id: int, *, db: str | None = None):
+    con = _conn(db)
+    with con:
+        ids = [r[0] for r in con.execute("SELECT id FROM segments WHERE doc_id=?", (doc_id,))]
+        con.executemany("DELETE FROM segments_fts WHERE rowid=?", [(i,) for i in ids])
+        con.execute("DELETE FROM docs WHERE id=?", (doc_id,))
+
+# ---------------------------
+# Query
+# ---------------------------
+def search(query: str, *, limit: int = 20, kind: str | None = None, session: str | None = None,
+           db: str | None = None) -> dict:
+    """
+    Full-text search. Plain words are ANDed; "quoted phrases" and prefix* work.
+    Returns {"hits": [...], "elapsed_ms": float}; each hit has doc/segment ids,
+    kind, source, snippet, and matches=[{word, start, end}] with word timestamps.
+    """
+    t0 = time.perf_counter()
+    fts_q, terms = _fts_query(query)
+    if not fts_q:
+        return {"hits": [], "elapsed_ms": 0.0}
+    con = _conn(db)
+    # User terms match the text column only; kind/session filters are tag tokens ANDed
+    # into the same MATCH, so FTS5 intersects posting lists instead of joining every hit.
+    match = f"text : ({fts_q})"
+    if kind or session:
+        match += " AND tags : (" + " ".join(f'"{t}"' for t in _tags(kind, session).split()) + ")"
+    # bm25 ranking cost grows with the number of matches; for very common terms rank
+    # only the newest MAX_CANDIDATES matching segments (FTS5 walks rowids cheaply).
+    try:
+        floor = con.execute(
+            "SELECT rowid FROM segments_fts WHERE segments_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            (match, MAX_CANDIDATES),
+        ).fetchone()
+    except sqlite3.OperationalError as e:
+        return {"hits": [], "elapsed_ms": _ms(t0), "error": f"Bad query: {e}"}
+    sql = ("SELECT s.id, s.doc_id, s.start_ms, s.end_ms, s.timings, d.kind, d.source, d.session, d.created,"
+           " snippet(segments_fts, 0, '**', '**', '…', 16), segments_fts.text"
+           " FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid JOIN docs d ON d.id = s.doc_id"
+           " WHERE segments_fts MATCH ? AND segments_fts.rowid > ?"
+           " ORDER BY bm25(segments_fts, 1.0, 0.0) LIMIT ?")   # tags do not count towards rank
+    args = [match, floor[0] if floor else 0, int(limit)]
+    try:
+        rows = con.execute(sql, args).fetchall()
+    except sqlite3.OperationalError as e:
+        return {"hits": [], "elapsed_ms": _ms(t0), "error": f"Bad query: {e}"}
+
+    hits = []
+    for seg_id, doc_id, s_ms, e_ms, timings, kind_, source, sess, created, snip, text in rows:
+        hits.append({
+            "doc_id": doc_id,
+            "segment_id": seg_id,
+            "kind": kind_,
+            "source": source,
+            "session": sess,
+            "created": created,
+            "segment_start": s_ms,
+            "segment_end": e_ms,
+            "snippet": snip,
+            "matches": _locate(text, json.loads(timings) if timings else None, terms),
+        })
+    return {"hits": hits, "elapsed_ms": _ms(t0), "capped": bool(floor)}
+
+def stats(*, db: str | None = None) -> dict:
+    con = _conn(db)
+    docs = dict(con.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind").fetchall())
+    segs = con.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+    return {"docs": docs, "segments": segs, "path": db or DB_PATH}
+
+def _fts_query(query: str) -> tuple[str, list[tuple[str, bool]]]:
+    """User text -> safe FTS5 query + [(term, is_prefix)] for hit location."""
+    parts: list[str] = []
+    terms: list[tuple[str, bool]] = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query):
+        if phrase:
+            toks = [t.lower() for t in _WORD_RE.findall(phrase)]
+            if toks:
+                parts.append('"' + " ".join(toks) + '"')
+                terms.extend((t, False) for t in toks)
+            continue
+        prefix = word.endswith("*")
+        for t in _WORD_RE.findall(word):
+            t = t.lower()
+            parts.append(f'"{t}"' + ("*" if prefix else ""))
+            terms.append((t, prefix))
+    return " ".join(parts), terms
+
+def _locate(text: str, timings: list | None, terms: list[tuple[str, bool]]) -> list[dict]:
+    out = []
+    for i, w in enumerate(text.split(" ")):
+        norm = " ".join(_WORD_RE.findall(w.lower()))
+        if not norm:
+            continue
+        if any(norm == t or (p and norm.startswith(t)) for t, p in terms):
+            start, end = (timings[i] if timings and i < len(timings) else (None, None))
+            out.append({"word": w, "start": start, "end": end})
+    return out
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 2)
+
+# ---------------------------
+# Benchmark: python search_index.py bench [n_docs] [db]
+# ---------------------------
+def bench(n_docs: int = 100_000, db: str = "gmf_index_bench.db", words_per_doc: int = 300) -> dict:
+    """Build a synthetic index (if empty) and time a few representative queries."""
+    import random
+    rnd = random.Random(7)
+    vocab = [f"w{i}" for i in range(20000)] + ["livekit", "grok", "builder", "deadline", "budget", "n8n"]
+    common = ["the", "and", "to", "we", "so"]  # ~25% of spoken words are stop-word-ish
+    con = _conn(db)
+    have = con.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    t0 = time.perf_counter()
+    for d in range(have, n_docs):
+        words, t = [], 0
+        for _ in range(words_per_doc):
+            text = rnd.choice(common) if rnd.random() < 0.25 else rnd.choice(vocab)
+            words.append({"text": text, "start": t, "end": t + 250})
+            t += 300
+        # every 3rd doc a reply; sessions of 20 docs (the Search page's Type / This session filters)
+        _add(kind="reply" if d % 3 == 0 else "transcript", source=f"synthetic-{d}",
+             session=f"bench-{d // 20}", meta={}, words=words, db=db)
+    build_s = time.perf_counter() - t0
+    timings = {}
+    cases = [(q, {}) for q in ("deadline", "grok budget", '"livekit grok"', "the", "dead*", "w1 w2 w3")]
+    cases += [("the", {"kind": "reply"}), ("the", {"session": "bench-7"}),
+              ("deadline", {"kind": "transcript"}), ("deadline", {"session": f"bench-{n_docs // 40}"})]
+    for q, filters in cases:
+        key = q + "".join(f" [{k}={v}]" for k, v in filters.items())
+        timings[key] = min(search(q, limit=20, db=db, **filters)["elapsed_ms"] for _ in range(5))
+    return {"docs": n_docs, "build_s": round(build_s, 1), "query_ms_best_of_5": timings}
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+        print(json.dumps(bench(n, *(sys.argv[3:4] or [])), indent=2))
+    else:
+        print(json.dumps(search(" ".join(sys.argv[1:])), indent=2))
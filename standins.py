@@ -0,0 +1,366 @@
+# standins.py — GrokMind Fusion local upstream stand-ins
+# Small in-process HTTP servers that mimic the upstream APIs closely enough for the
+# real client code paths (assemblyai SDK, voice.py) to run against them offline.
+#
+#   AssemblyAIStandIn — /v2/upload (+ ranged chunk sessions, injectable chunk failures), /v2/transcript
+#                       (+ webhook callback after a delay)
+#   XAIStandIn        — OpenAI-compatible /v1/chat/completions
+#   N8NStandIn        — webhook sink for single events and batch envelopes
+#                       (python standins.py bench-n8n: events/sec per batch size)
+#
+# Requests may carry a replay hint (see traffic.py) anywhere in their body:
+#   [gmf-replay delay=0.532 reply_chars=120]
+# which sets that request's upstream latency / reply size.
+
+from __future__ import annotations
+
+import re
+import json
+import time
+import uuid
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_HINT = re.compile(rb"\[gmf-replay ([^\]]*)\]")
+
+def replay_hint(body: bytes) -> dict[str, float]:
+    """Parse a '[gmf-replay k=v …]' marker out of a request body ({} when absent)."""
+    m = _HINT.search(body or b"")
+    if not m:
+        return {}
+    out = {}
+    for part in m.group(1).decode("ascii", "replace").split():
+        k, _, v = part.partition("=")
+        try:
+            out[k] = float(v)
+        except ValueError:
+            pass
+    return out
+
+class _StandIn:
+    """Base: run a ThreadingHTTPServer on a free localhost port in a daemon thread."""
+
+    handler_cls: type[BaseHTTPRequestHandler]
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._host, self._port = host, port
+        self.server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        handler = type(self.handler_cls.__name__, (self.handler_cls,), {"standin": self})
+        self.server = ThreadingHTTPServer((self._host, self._port), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.stop()
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    standin: _StandIn
+
+    def _body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            out = bytearray()
+            while True:
+                size = int(self.rfile.readline().strip() or b"0", 16)
+                if not size:
+                    self.rfile.readline()
+                    return bytes(out)
+                out += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _json(self, status: int, obj):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_args):
+        pass
+
+# ---------------------------
+# AssemblyAI
+# ---------------------------
+class _AAIHandler(_JSONHandler):
+    standin: "AssemblyAIStandIn"
+
+    def _denied(self) -> bool:
+        sa = self.standin
+        if sa.api_key is None or self.headers.get("authorization") == sa.api_key:
+            return False
+        with sa.lock:
+            sa.auth_failures += 1
+        self._json(401, {"error": "Authentication error, API token missing/invalid"})
+        return True
+
+    def do_POST(self):
+        sa = self.standin
+        body = self._body()
+        if self._denied():
+            return
+        if self.path == "/v2/upload":
+            fid = uuid.uuid4().hex
+            sa.uploads[fid] = body
+            return self._json(200, {"upload_url": f"{sa.url}/files/{fid}"})
+        if self.path == "/v2/upload/sessions":
+            req = json.loads(body or b"{}")
+            sid = uuid.uuid4().hex
+            sa.sessions[sid] = {"size": int(req.get("size", 0)), "parts": {}}
+            return self._json(200, {"session": sid})
+        if self.path.startswith("/v2/upload/sessions/") and self.path.endswith("/complete"):
+            sid = self.path.split("/")[4]
+            sess = sa.sessions.get(sid)
+            if sess is None:
+                return self._json(404, {"error": "unknown session"})
+            blob = b"".join(sess["parts"][a] for a in sorted(sess["parts"]))
+            if len(blob) != sess["size"]:
+                return self._json(409, {"error": f"incomplete: {len(blob)}/{sess['size']} bytes"})
+            fid = uuid.uuid4().hex
+            sa.uploads[fid] = blob
+            del sa.sessions[sid]
+            return self._json(200, {"upload_url": f"{sa.url}/files/{fid}"})
+        if self.path == "/v2/transcript":
+            req = json.loads(body or b"{}")
+            tid = uuid.uuid4().hex
+            audio = sa.uploads.get(req.get("audio_url", "").rsplit("/", 1)[-1], b"")
+            sa.transcripts[tid] = {"id": tid, "status": "queued", "audio_url": req.get("audio_url"),
+                                   "webhook_url": req.get("webhook_url"), "text": None, "words": None}
+            delay = replay_hint(audio[:256]).get("delay", sa.delay_s)
+            threading.Timer(delay, sa._complete, args=(tid, req, len(audio))).start()
+            return self._json(200, sa.transcripts[tid])
+        self._json(404, {"error": "not found"})
+
+    def do_PUT(self):
+        sa = self.standin
+        sid = self.path.rsplit("/", 1)[-1]
+        sess = sa.sessions.get(sid)
+        body = self._body()
+        if self._denied():
+            return
+        if sess is None:
+            return self._json(404, {"error": "unknown session"})
+        with sa.lock:
+            if sa.fail_chunks > 0:   # injected transient failure
+                sa.fail_chunks -= 1
+                return self._json(503, {"error": "injected chunk failure"})
+            if sa.drop_after is not None and sa.chunks_put >= sa.drop_after:
+                return self._json(503, {"error": "injected outage"})
+            sa.chunks_put += 1
+        rng = self.headers.get("Content-Range", "")          # bytes a-b/total
+        a = int(rng.split()[1].split("-")[0])
+        sess["parts"][a] = body
+        self._json(200, {"received": len(body)})
+
+    def do_GET(self):
+        sa = self.standin
+        if self._denied():
+            return
+        if self.path.startswith("/v2/upload/sessions/"):
+            sess = sa.sessions.get(self.path.rsplit("/", 1)[-1])
+            if sess is None:
+                return self._json(404, {"error": "unknown session"})
+            return self._json(200, {"received": [[a, a + len(p)] for a, p in sorted(sess["parts"].items())]})
+        if self.path.startswith("/v2/transcript/"):
+            tid = self.path.rsplit("/", 1)[-1]
+            sa.gets += 1
+            t = sa.transcripts.get(tid)
+            return self._json(200, t) if t else self._json(404, {"error": "Transcript not found"})
+        self._json(404, {"error": "not found"})
+
+class AssemblyAIStandIn(_StandIn):
+    """
+    Fake AssemblyAI v2 API. Transcripts complete after `delay_s` with `text`
+    (one word per ~300 ms) and, if a webhook_url was given, it is called back
+    like the real service: POST {"transcript_id", "status"} with the auth header.
+    """
+
+    handler_cls = _AAIHandler
+
+    def __init__(self, *, delay_s: float = 1.0, text: str = "hello from the stand in",
+                 fail: bool = False, fail_chunks: int = 0, drop_after: int | None = None,
+                 api_key: str | None = None, **kw):
+        super().__init__(**kw)
+        self.delay_s, self.text, self.fail = delay_s, text, fail
+        self.api_key = api_key              # when set, other authorization headers get 401
+        self.auth_failures = 0
+        self.fail_chunks = fail_chunks      # reject the next N chunk PUTs with 503
+        self.drop_after = drop_after        # accept this many chunk PUTs, then 503 all (outage mid-upload)
+        self.chunks_put = 0
+        self.lock = threading.Lock()
+        self.uploads: dict[str, bytes] = {}
+        self.sessions: dict[str, dict] = {}
+        self.transcripts: dict[str, dict] = {}
+        self.webhooks_sent = 0
+        self.gets = 0
+
+    def _complete(self, tid: str, req: dict, audio_bytes: int):
+        t = self.transcripts[tid]
+        if self.fail:
+            t.update(status="error", error="stand-in failure")
+        else:
+            words = [{"text": w, "start": i * 300, "end": i * 300 + 250, "confidence": 0.95}
+                     for i, w in enumerate(self.text.split())]
+            t.update(status="completed", text=self.text, words=words, confidence=0.95,
+                     audio_duration=max(1, len(words) * 0.3), audio_bytes=audio_bytes)
+        hook = req.get("webhook_url")
+        if hook:
+            headers = {"Content-Type": "application/json"}
+            if req.get("webhook_auth_header_name"):
+                headers[req["webhook_auth_header_name"]] = req.get("webhook_auth_header_value", "")
+            payload = json.dumps({"transcript_id": tid, "status": t["status"]}).encode()
+            try:
+                urllib.request.urlopen(urllib.request.Request(hook, payload, headers, method="POST"), timeout=5)
+                self.webhooks_sent += 1
+            except Exception as e:
+                print(f"(warn) stand-in webhook failed: {e}")
+
+# ---------------------------
+# xAI (OpenAI-compatible chat completions)
+# ---------------------------
+class _XAIHandler(_JSONHandler):
+    standin: "XAIStandIn"
+
+    def do_POST(self):
+        sx = self.standin
+        body = self._body()
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            return self._json(404, {"error": {"message": "not found"}})
+        req = json.loads(body or b"{}")
+        hint = replay_hint(body)
+        time.sleep(hint.get("delay", sx.model_delays.get(req.get("model"), sx.delay_s)))
+        with sx.lock:
+            sx.calls += 1
+            fail = sx.fail_every and sx.calls % sx.fail_every == 0
+        if fail:
+            return self._json(503, {"error": {"message": "injected failure"}})
+        n = int(hint.get("reply_chars", len(sx.reply)))
+        content = (sx.reply * (n // max(len(sx.reply), 1) + 1))[:max(n, 1)]
+        prompt_chars = sum(len(m.get("content") or "") for m in req.get("messages", []))
+        usage = {"prompt_tokens": (prompt_chars + 3) // 4, "completion_tokens": (len(content) + 3) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self._json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+            "model": req.get("model", "grok-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            return self._json(200, {"object": "list", "data": [{"id": "grok-4", "object": "model"}]})
+        self._json(404, {"error": {"message": "not found"}})
+
+class XAIStandIn(_StandIn):
+    """
+    Fake xAI API; point tools.XAI_BASE_URL at f"{url}/v1". Replies after `delay_s`
+    (or model_delays[model], e.g. to make one model slow for the router).
+    """
+
+    handler_cls = _XAIHandler
+
+    def __init__(self, *, delay_s: float = 0.2, reply: str = "Stand-in reply. ", fail_every: int = 0,
+                 model_delays: dict[str, float] | None = None, **kw):
+        super().__init__(**kw)
+        self.delay_s, self.reply = delay_s, reply
+        self.model_delays = dict(model_delays or {})
+        self.fail_every = fail_every        # every Nth call answers 503 (0 = never)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+# ---------------------------
+# n8n webhook sink
+# ---------------------------
+class _N8NHandler(_JSONHandler):
+    standin: "N8NStandIn"
+
+    def do_POST(self):
+        sn = self.standin
+        body = self._body()
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            return self._json(400, {"error": "invalid JSON"})
+        items = req.get("batch") if sn.batch and isinstance(req, dict) else None
+        n = len(items) if isinstance(items, list) else 1
+        time.sleep(replay_hint(body).get("delay", sn.delay_s + sn.per_event_s * n))
+        with sn.lock:
+            sn.requests += 1
+            sn.events += n
+            sn.bytes += len(body)
+        if items is None:
+            # Single event, or an old workflow that treats the whole envelope as one event
+            return self._json(200, {"ok": True})
+        self._json(200, {"results": [{"id": it.get("id"), "ok": True} for it in items]})
+
+class N8NStandIn(_StandIn):
+    """
+    Fake n8n webhook. Each request costs `delay_s` (webhook + execution overhead)
+    plus `per_event_s` per event. batch=False behaves like a single-event workflow
+    that ignores the batch envelope.
+    """
+
+    handler_cls = _N8NHandler
+
+    def __init__(self, *, delay_s: float = 0.05, per_event_s: float = 0.0, batch: bool = True, **kw):
+        super().__init__(**kw)
+        self.delay_s, self.per_event_s, self.batch = delay_s, per_event_s, batch
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.events = 0
+        self.bytes = 0
+
+def bench_n8n(batch_sizes=(1, 10, 50, 100), *, events: int = 500, delay_s: float = 0.05,
+              per_event_s: float = 0.0005) -> list[dict]:
+    """Events/sec through tools.n8n_post_batch at each batch size against an N8NStandIn."""
+    import os
+    import tools
+
+    rows = []
+    with N8NStandIn(delay_s=delay_s, per_event_s=per_event_s) as sn:
+        os.environ["N8N_LOG_URL"] = f"{sn.url}/webhook/log"
+        tools.N8N_BATCH = True
+        for size in batch_sizes:
+            sn.requests = sn.events = 0
+            evs = [("bench", {"i": i, "text": "x" * 200}) for i in range(events)]
+            t0 = time.perf_counter()
+            ok = 0
+            for i in range(0, events, size):
+                ok += sum(r.get("ok", False) for r in tools.n8n_post_batch(evs[i:i + size]))
+            wall = time.perf_counter() - t0
+            rows.append({"batch_size": size, "events": events, "ok": ok, "requests": sn.requests,
+                         "wall_s": round(wall, 3), "events_per_s": round(events / wall, 1)})
+    return rows
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["bench-n8n"]:
+        print(json.dumps(bench_n8n(), indent=2))
+        sys.exit(0)
+    # python standins.py — run all stand-ins; point ASSEMBLYAI_BASE_URL / XAI_BASE_URL / N8N_LOG_URL at them
+    with AssemblyAIStandIn(port=8909) as sa, XAIStandIn(port=8910) as sx, N8NStandIn(port=8911) as sn:
+        print(f"AssemblyAI stand-in on {sa.url}\nxAI stand-in on {sx.url}/v1\n"
+              f"n8n stand-in on {sn.url}/webhook/log (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,188 @@
+# summarize.py — GrokMind Fusion long-input mode
+# Map-reduce summarisation of long transcripts: split on AssemblyAI word timestamps
+# into token-budgeted chunks, summarise chunks concurrently (bounded pool), then
+# reduce the partial summaries hierarchically. Yields progress events for the UI.
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Generator, Iterable
+
+import tools
+import usage
+import metrics
+
+LONG_INPUT_TOKENS = int(os.getenv("GMF_LONG_INPUT_TOKENS", "6000"))   # above this, use map-reduce
+CHUNK_TOKENS = int(os.getenv("GMF_CHUNK_TOKENS", "2000"))
+MAX_WORKERS = int(os.getenv("GMF_SUMMARY_WORKERS", "4"))
+REDUCE_FANIN = max(2, int(os.getenv("GMF_REDUCE_FANIN", "6")))   # < 2 would never converge
+
+STAGE_LATENCY = metrics.histogram("gmf_summarize_seconds", "Map-reduce summarisation stage time", ("stage",))
+
+MAP_SYSTEM = ("You summarise one section of a longer audio transcript. Keep names, numbers, "
+              "decisions and open questions. Be dense; no preamble.")
+REDUCE_SYSTEM = ("You merge timed section summaries of one recording into a single coherent summary. "
+                 "Keep chronology, names, numbers and decisions; drop repetition.")
+
+def is_long(text: str) -> bool:
+    return tools.estimate_tokens(text) > LONG_INPUT_TOKENS
+
+# ---------------------------
+# Chunking
+# ---------------------------
+def chunk_words(words: Iterable[dict], budget: int = CHUNK_TOKENS) -> list[dict]:
+    """
+    Group AssemblyAI words ({text,start,end,...}) into chunks of ~budget tokens.
+    Prefers to cut after sentence punctuation once a chunk is 80% full.
+    Returns [{text, start, end, tokens}] with start/end in ms.
+    """
+    chunks: list[dict] = []
+    buf: list[str] = []
+    start = end = None
+    tokens = 0
+    soft = int(budget * 0.8)
+
+    def flush():
+        nonlocal buf, start, end, tokens
+        if buf:
+            chunks.append({"text": " ".join(buf), "start": start, "end": end, "tokens": tokens})
+        buf, start, end, tokens = [], None, None, 0
+
+    for w in words:
+        text = w.get("text") or ""
+        if not text:
+            continue
+        cost = tools.estimate_tokens(text + " ")
+        if buf and tokens + cost > budget:
+            flush()
+        if start is None:
+            start = w.get("start")
+        buf.append(text)
+        end = w.get("end")
+        tokens += cost
+        if tokens >= soft and text[-1:] in ".?!":
+            flush()
+    flush()
+    return chunks
+
+def chunk_text(text: str, budget: int = CHUNK_TOKENS) -> list[dict]:
+    """Fallback when no word timings are available (start/end stay None)."""
+    return chunk_words(({"text": t} for t in text.split()), budget)
+
+# ---------------------------
+# Map-reduce
+# ---------------------------
+def map_reduce(words: list[dict] | None = None, *, text: str = "",
+               instruction: str = "You are Mind Fusion. Reply concisely to this recording.",
+               chunk_tokens: int = CHUNK_TOKENS, max_workers: int = MAX_WORKERS,
+               fanin: int = REDUCE_FANIN, compare_monolithic: bool = False,
+               model: str | None = None) -> Generator[dict, None, None]:
+    """
+    Summarise a long transcript. Yields events as they complete:
+      {"stage": "plan",   "chunks": n}
+      {"stage": "map",    "index": i, "start": ms, "end": ms, "summary": str}
+      {"stage": "reduce", "level": L, "index": i, "summary": str}
+      {"stage": "done",   "summary": str, "stats": {...}}
+    Map and reduce calls share one bounded pool (max_workers concurrent Grok calls).
+    """
+    t0 = time.perf_counter()
+    fanin = max(2, fanin)   # each reduce level must shrink the list
+    chunks = chunk_words(words, chunk_tokens) if words else chunk_text(text, chunk_tokens)
+    if not chunks:
+        return
+    yield {"stage": "plan", "chunks": len(chunks), "tokens": sum(c["tokens"] for c in chunks)}
+
+    call_s: list[float] = []
+
+    @usage.carry   # pool threads bill the caller's session/page
+    def ask(prompt: str, system: str) -> str:
+        c0 = time.perf_counter()
+        try:
+            return tools.grok_chat(prompt, system=system, model=model, latency_class="batch")
+        finally:
+            call_s.append(time.perf_counter() - c0)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="gmf-summ") as pool:
+        # --- map ---
+        m0 = time.perf_counter()
+        futs = {
+            pool.submit(ask, f"Section {span_label(c)}:\n{c['text']}", MAP_SYSTEM): i
+            for i, c in enumerate(chunks)
+        }
+        partials: list[str] = [""] * len(chunks)
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                partials[i] = fut.result()
+            except Exception as e:
+                partials[i] = f"(section summary failed: {e})"
+            yield {"stage": "map", "index": i, "start": chunks[i]["start"], "end": chunks[i]["end"],
+                   "summary": partials[i]}
+        map_s = time.perf_counter() - m0
+        STAGE_LATENCY.observe(map_s, stage="map")
+
+        # --- hierarchical reduce (fan-in groups, in chronological order) ---
+        r0 = time.perf_counter()
+        level = 0
+        items = [f"[{span_label(c)}] {s}" for c, s in zip(chunks, partials)]
+        while len(items) > 1 or level == 0:
+            level += 1
+            groups = [items[i:i + fanin] for i in range(0, len(items), fanin)]
+            last = len(groups) == 1
+            futs = {}
+            for gi, group in enumerate(groups):
+                head = instruction if last else "Merge these consecutive section summaries."
+                futs[pool.submit(ask, head + "\n\n" + "\n\n".join(group), REDUCE_SYSTEM)] = gi
+            merged: list[str] = [""] * len(groups)
+            for fut in as_completed(futs):
+                gi = futs[fut]
+                try:
+                    merged[gi] = fut.result()
+                except Exception as e:
+                    merged[gi] = "\n".join(groups[gi]) + f"\n(merge failed: {e})"
+                yield {"stage": "reduce", "level": level, "index": gi, "summary": merged[gi]}
+            items = merged
+        reduce_s = time.perf_counter() - r0
+        STAGE_LATENCY.observe(reduce_s, stage="reduce")
+
+    wall_s = time.perf_counter() - t0
+    STAGE_LATENCY.observe(wall_s, stage="total")
+    stats = {
+        "chunks": len(chunks),
+        "reduce_levels": level,
+        "grok_calls": len(call_s),
+        "wall_s": round(wall_s, 2),
+        "map_s": round(map_s, 2),
+        "reduce_s": round(reduce_s, 2),
+        "serial_equiv_s": round(sum(call_s), 2),   # what the same calls would cost one by one
+        "parallel_speedup": round(sum(call_s) / wall_s, 2) if wall_s else None,
+    }
+    if compare_monolithic:
+        stats.update(_monolithic(" ".join(c["text"] for c in chunks), instruction, model, wall_s))
+    yield {"stage": "done", "summary": items[0], "stats": stats}
+
+def _monolithic(full_text: str, instruction: str, model: str | None, mr_wall_s: float) -> dict:
+    """Time the old single-prompt path on the same input for comparison."""
+    c0 = time.perf_counter()
+    try:
+        tools.grok_chat(f"{instruction}\n\n{full_text}", model=model, latency_class="batch")
+        err = None
+    except Exception as e:
+        err = str(e)
+    mono_s = time.perf_counter() - c0
+    STAGE_LATENCY.observe(mono_s, stage="monolithic")
+    out = {"monolithic_s": round(mono_s, 2), "speedup_vs_monolithic": round(mono_s / mr_wall_s, 2) if mr_wall_s else None}
+    if err:
+        out["monolithic_error"] = err
+    return out
+
+def span_label(chunk: dict) -> str:
+    if chunk.get("start") is None:
+        return "?"
+    return f"{_clock(chunk['start'])}–{_clock(chunk['end'])}"
+
+def _clock(ms) -> str:
+    s = int((ms or 0) // 1000)
+    return f"{s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}" if s >= 3600 else f"{s // 60}:{s % 60:02d}"
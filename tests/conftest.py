@@ -0,0 +1,39 @@
+# tests/conftest.py — shared setup for the stand-in driven tests
+# Modules read their config from the environment at import time, so every state file
+# (usage, jobs, search index) goes to a throwaway directory before anything is imported.
+
+from __future__ import annotations
+
+import os
+import sys
+import socket
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = tempfile.mkdtemp(prefix="gmf-tests-")
+
+sys.path.insert(0, ROOT)
+os.environ.update(
+    GMF_METRICS_PORT="0",
+    GMF_PREWARM="0",
+    GMF_CAPTURE="",
+    AAI_WEBHOOK_URL="",
+    GMF_USAGE_DB=os.path.join(STATE_DIR, "usage.db"),
+    GMF_JOBS_DB=os.path.join(STATE_DIR, "jobs.db"),
+    GMF_JOBS_DIR=os.path.join(STATE_DIR, "jobs_files"),
+    GMF_INDEX_DB=os.path.join(STATE_DIR, "index.db"),
+)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def audio_file(tmp_path):
+    """A small opaque audio file (non-PCM suffix, so upload.py sends it as-is)."""
+    path = tmp_path / "clip.bin"
+    path.write_bytes(b"\0" * 4096)
+    return str(path)
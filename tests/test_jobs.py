@@ -0,0 +1,123 @@
+# tests/test_jobs.py — jobs.py queue semantics: lease expiry + requeue, the attempts
+# cap, heartbeats keeping long jobs leased, the _finish ownership guard, and the
+# "no worker" cancel in poll().
+
+from __future__ import annotations
+
+import time
+import threading
+
+import pytest
+
+import jobs
+
+def _boom(_p: dict):
+    raise ValueError("boom")
+
+@pytest.fixture(autouse=True)
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "DB_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setitem(jobs.HANDLERS, "echo", lambda p: {"echo": p.get("x")})
+    monkeypatch.setitem(jobs.HANDLERS, "boom", _boom)
+
+@pytest.fixture
+def workers():
+    """start(name, ...) runs work_forever in a thread; all are stopped after the test."""
+    stop = threading.Event()
+    threads = []
+
+    def start(*names: str):
+        for name in names:
+            t = threading.Thread(target=jobs.work_forever, args=(name,),
+                                 kwargs={"idle_max_s": 0.05, "stop": stop}, daemon=True)
+            t.start()
+            threads.append(t)
+
+    yield start
+    stop.set()
+    for t in threads:
+        t.join(5)
+
+def test_run_returns_result(workers):
+    workers("w1")
+    assert jobs.run("echo", {"x": 7}, timeout=5) == {"echo": 7}
+
+def test_run_raises_worker_error(workers):
+    workers("w1")
+    with pytest.raises(RuntimeError, match="ValueError: boom"):
+        jobs.run("boom", {}, timeout=5)
+
+def test_one_worker_drains_several_jobs(workers):
+    job_ids = [jobs.submit("echo", {"x": i}) for i in range(3)]
+    workers("w1")
+    results = [jobs.wait(job_id, 5) for job_id in job_ids]
+    assert [(j["status"], j["result"], j["worker"]) for j in results] == \
+        [("done", {"echo": i}, "w1") for i in range(3)]
+
+def test_expired_lease_is_requeued_and_stale_finish_ignored(monkeypatch):
+    job_id = jobs.submit("echo", {"x": 1})
+    assert jobs.claim("w1")[0] == job_id          # w1 "dies" holding the lease
+    monkeypatch.setattr(jobs, "LEASE_S", 0.05)
+    time.sleep(0.1)
+    assert jobs.claim("w2")[0] == job_id          # requeued and reclaimed
+    assert jobs.get(job_id)["attempts"] == 2
+
+    assert jobs._finish(job_id, "w1", result="stale") is False
+    assert jobs._finish(job_id, "w2", result="fresh") is True
+    job = jobs.get(job_id)
+    assert (job["status"], job["worker"], job["result"]) == ("done", "w2", "fresh")
+    assert jobs._finish(job_id, "w2", error="late") is False   # finished rows are final
+
+def test_expired_lease_errors_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_ATTEMPTS", 1)
+    job_id = jobs.submit("echo", {})
+    jobs.claim("w1")
+    monkeypatch.setattr(jobs, "LEASE_S", 0.05)
+    time.sleep(0.1)
+    assert jobs.claim("w2") is None
+    job = jobs.get(job_id)
+    assert (job["status"], job["error"]) == ("error", "lease expired")
+
+def test_heartbeat_keeps_long_job_leased(monkeypatch, workers):
+    monkeypatch.setattr(jobs, "LEASE_S", 0.3)
+    monkeypatch.setattr(jobs, "HEARTBEAT_S", 0.05)
+    calls = []
+
+    def slow(p):
+        calls.append(time.time())
+        time.sleep(1.0)          # > 3 leases
+        return "ok"
+
+    monkeypatch.setitem(jobs.HANDLERS, "slow", slow)
+    job_id = jobs.submit("slow", {})
+    workers("w1", "w2")
+    job = jobs.wait(job_id, 10)
+    assert (job["status"], job["result"], job["attempts"]) == ("done", "ok", 1)
+    assert len(calls) == 1
+
+def test_poll_cancels_job_no_worker_claims():
+    job_id = jobs.submit("echo", {})
+    time.sleep(0.1)
+    job = jobs.poll(job_id, claim_timeout=0.05)
+    assert job["status"] == "error"
+    assert "no worker claimed" in job["error"]
+    assert jobs.claim("w1") is None               # cancelled jobs are never run later
+
+def test_poll_keeps_job_queued_behind_busy_worker(monkeypatch, workers):
+    monkeypatch.setattr(jobs, "HEARTBEAT_S", 0.05)
+    release = threading.Event()
+    monkeypatch.setitem(jobs.HANDLERS, "slow", lambda p: release.wait(5))
+    busy = jobs.submit("slow", {})
+    workers("w1")
+    waiting = jobs.submit("echo", {"x": 1})
+    time.sleep(0.5)
+    assert jobs.get(busy)["status"] == "running"
+    assert jobs.poll(waiting, claim_timeout=0.1)["status"] == "queued"   # busy, not absent
+    release.set()
+    assert jobs.wait(waiting, 5, claim_timeout=0.1)["result"] == {"echo": 1}
+
+def test_poll_leaves_running_job_alone():
+    job_id = jobs.submit("echo", {})
+    jobs.claim("w1")
+    time.sleep(0.1)
+    assert jobs.poll(job_id, claim_timeout=0.05)["status"] == "running"
@@ -0,0 +1,114 @@
+# tests/test_upload.py — upload.py against the AssemblyAI stand-in: ranged chunk
+# uploads with transient failures, resume after an outage mid-upload, no retries on
+# a rejected key, and lossless FLAC transcoding at the source bit depth.
+
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+
+import upload
+from standins import AssemblyAIStandIn
+
+CHUNK = 64 * 1024
+
+@pytest.fixture
+def ranged(monkeypatch):
+    monkeypatch.setattr(upload, "RANGED", True)
+    monkeypatch.setattr(upload, "CHUNK_BYTES", CHUNK)
+    monkeypatch.setattr(upload, "WORKERS", 1)        # chunks in order, so an outage splits them cleanly
+    monkeypatch.setattr(upload, "RETRIES", 2)
+    monkeypatch.setattr(upload, "_SESSIONS", {})
+    with AssemblyAIStandIn() as sa:
+        yield sa
+
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    """Retry back-offs taken (not actually slept)."""
+    taken = []
+    monkeypatch.setattr(upload.time, "sleep", taken.append)
+    return taken
+
+def _blob(path: str) -> bytes:
+    data = os.urandom(10 * CHUNK + 123)
+    with open(path, "wb") as f:
+        f.write(data)
+    return data
+
+def _uploaded(sa: AssemblyAIStandIn, url: str) -> bytes:
+    return sa.uploads[url.rsplit("/", 1)[-1]]
+
+def test_ranged_upload_retries_transient_chunk_failures(ranged, tmp_path, monkeypatch, sleeps):
+    monkeypatch.setattr(upload, "RETRIES", 3)
+    path = str(tmp_path / "big.bin")
+    data = _blob(path)
+    ranged.fail_chunks = 2                          # the first chunk succeeds on its third try
+    url, stats = upload.upload_file(path, base_url=ranged.url, api_key="test")
+    assert _uploaded(ranged, url) == data
+    assert (stats["mode"], stats["chunks"], stats["retries"]) == ("ranged", 11, 2)
+    assert sleeps == [1, 2]
+
+def test_ranged_upload_resumes_after_outage(ranged, tmp_path, sleeps):
+    path = str(tmp_path / "big.bin")
+    data = _blob(path)
+    ranged.drop_after = 4                           # connection "lost" after 4 chunks
+    with pytest.raises(RuntimeError, match="failed after 2 attempts"):
+        upload.upload_file(path, base_url=ranged.url, api_key="test")
+    assert ranged.chunks_put == 4
+    assert sleeps == [1]                            # no back-off after the last attempt
+
+    ranged.drop_after = None
+    url, stats = upload.upload_file(path, base_url=ranged.url, api_key="test")
+    assert _uploaded(ranged, url) == data
+    assert stats["resumed_bytes"] == 4 * CHUNK
+    assert ranged.chunks_put == 11                  # only the 7 missing chunks were sent again
+    assert upload._SESSIONS == {}                   # finished sessions are forgotten
+
+@pytest.mark.parametrize("size", [1000, 10 * CHUNK])   # single and ranged
+def test_rejected_key_is_not_retried(tmp_path, monkeypatch, sleeps, size):
+    monkeypatch.setattr(upload, "RANGED", True)
+    monkeypatch.setattr(upload, "CHUNK_BYTES", CHUNK)
+    monkeypatch.setattr(upload, "_SESSIONS", {})
+    path = str(tmp_path / "clip.bin")
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    with AssemblyAIStandIn(api_key="good") as sa:
+        with pytest.raises(Exception, match="401"):
+            upload.upload_file(path, base_url=sa.url, api_key="bad")
+        assert sa.auth_failures == 1
+    assert sleeps == []
+
+def test_single_upload_below_chunk_size(ranged, tmp_path):
+    path = str(tmp_path / "small.bin")
+    with open(path, "wb") as f:
+        f.write(b"x" * 1000)
+    url, stats = upload.upload_file(path, base_url=ranged.url, api_key="test")
+    assert _uploaded(ranged, url) == b"x" * 1000
+    assert stats["mode"] == "single"
+
+@pytest.mark.parametrize("subtype, flac_subtype", [("PCM_16", "PCM_16"), ("PCM_24", "PCM_24"), ("PCM_U8", "PCM_S8")])
+def test_flac_keeps_source_bit_depth(tmp_path, subtype, flac_subtype):
+    np = pytest.importorskip("numpy")
+    sf = pytest.importorskip("soundfile")
+    path = str(tmp_path / f"tone_{subtype}.wav")
+    t = np.arange(48000) / 48000
+    sf.write(path, 0.4 * np.sin(2 * np.pi * 440 * t), 48000, subtype=subtype)
+
+    blob, info = upload.compress(path, fmt="flac")
+    assert info["format"] == "flac"
+    assert sf.info(io.BytesIO(blob)).subtype == flac_subtype
+    decoded, _ = sf.read(io.BytesIO(blob), dtype="int32")
+    source, _ = sf.read(path, dtype="int32")
+    assert np.array_equal(decoded, source)
+
+def test_float_pcm_is_sent_as_is(tmp_path):
+    np = pytest.importorskip("numpy")
+    sf = pytest.importorskip("soundfile")
+    path = str(tmp_path / "float.wav")
+    sf.write(path, np.zeros(4800, dtype="float32"), 48000, subtype="FLOAT")
+    blob, info = upload.compress(path, fmt="flac")
+    assert info["format"] == "original"
+    with open(path, "rb") as f:
+        assert blob == f.read()
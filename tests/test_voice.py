@@ -0,0 +1,105 @@
+# tests/test_voice.py — voice.py transcription against the AssemblyAI stand-in:
+# polling, webhook completion, webhook -> polling fallback, the webhook/poller race
+# in _resolve, and the transcribe_file timeout.
+
+from __future__ import annotations
+
+import time
+import threading
+
+import pytest
+
+import voice
+from standins import AssemblyAIStandIn
+from conftest import free_port
+
+@pytest.fixture
+def aai(monkeypatch):
+    with AssemblyAIStandIn(delay_s=0.2, text="one two three") as sa:
+        monkeypatch.setenv("ASSEMBLYAI_API_KEY", "test")
+        monkeypatch.setenv("ASSEMBLYAI_BASE_URL", sa.url)
+        monkeypatch.setattr(voice, "_AAI_KEY", None)          # re-read key / base URL
+        monkeypatch.setattr(voice, "POLL_FIRST_S", 0.05)
+        yield sa
+
+@pytest.fixture
+def webhook(monkeypatch):
+    """Run voice.py's webhook receiver on a free port for one test."""
+    port = free_port()
+    monkeypatch.setattr(voice, "AAI_WEBHOOK_PORT", port)
+    monkeypatch.setattr(voice, "AAI_WEBHOOK_URL", f"http://127.0.0.1:{port}")
+    monkeypatch.setattr(voice, "_RECEIVER", None)
+    yield port
+    if voice._RECEIVER is not None:
+        voice._RECEIVER.shutdown()
+        voice._RECEIVER.server_close()
+
+def test_poll_completes(aai, audio_file):
+    job = voice.transcribe_async(audio_file)
+    res = job.future.result(10)
+    assert res["text"] == "one two three"
+    assert [w["text"] for w in res["words"]] == ["one", "two", "three"]
+    assert job.via == "poll"
+    assert job.upload["sent_bytes"] == 4096
+
+def test_webhook_completes_before_safety_poll(aai, webhook, audio_file):
+    job = voice.transcribe_async(audio_file)     # hooked: first safety poll is 15 s away
+    res = job.future.result(5)
+    assert res["text"] == "one two three"
+    assert job.via == "webhook"
+    assert aai.webhooks_sent == 1
+    assert job.polls == 0
+
+def test_falls_back_to_polling_when_webhook_never_arrives(aai, webhook, monkeypatch, audio_file):
+    # Public URL points nowhere: the stand-in's callback fails, so only the poller can finish the job
+    monkeypatch.setattr(voice, "AAI_WEBHOOK_URL", f"http://127.0.0.1:{free_port()}")
+    monkeypatch.setattr(voice, "POLL_FIRST_HOOKED_S", 0.5)
+    job = voice.transcribe_async(audio_file)
+    res = job.future.result(10)
+    assert res["text"] == "one two three"
+    assert job.via == "poll"
+    assert aai.webhooks_sent == 0
+
+def test_webhook_and_poller_race_settles_once(aai, monkeypatch, audio_file):
+    monkeypatch.setattr(voice, "POLL_FIRST_S", 60.0)     # keep the poller out of it
+    job = voice.transcribe_async(audio_file)
+    deadline = time.time() + 5
+    while aai.transcripts[job.id]["status"] != "completed":
+        assert time.time() < deadline
+        time.sleep(0.02)
+
+    settled_before = sum(v for k, v in voice.AAI_COMPLETIONS.samples())
+    barrier = threading.Barrier(8)
+    results, errors = [], []
+
+    def deliver(via: str):
+        barrier.wait()
+        try:
+            results.append(voice._resolve(job.id, via))
+        except Exception as e:   # e.g. InvalidStateError from a second set_result
+            errors.append(e)
+
+    threads = [threading.Thread(target=deliver, args=("webhook" if i % 2 else "poll",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert results == [True] * 8
+    assert job.future.result(0)["text"] == "one two three"
+    assert job.via in ("webhook", "poll")
+    assert sum(v for k, v in voice.AAI_COMPLETIONS.samples()) == settled_before + 1
+    assert voice.get_job(job.id) is None
+
+def test_transcribe_file_times_out(aai, audio_file):
+    aai.delay_s = 5.0
+    t0 = time.perf_counter()
+    res = voice.transcribe_file(audio_file, timeout=0.3)
+    assert time.perf_counter() - t0 < 3
+    assert res["error"].startswith("Timed out after 0.3s")
+
+def test_error_transcript(aai, audio_file):
+    aai.fail = True
+    res = voice.transcribe_file(audio_file, timeout=10)
+    assert res == {"error": "stand-in failure"}
@@ -3,77 +3,504 @@
 # xAI (Grok), n8n event post, LiveKit token signing (server-side safe), Builder helper
 
 import os
+import json
 import time
+import uuid
+import threading
 import requests
+from collections import deque
 from typing import Optional
 from dotenv import load_dotenv
 from openai import OpenAI
 import jwt  # PyJWT
 
+import metrics
+import traffic
+import usage
+
 load_dotenv()
 
+# ---- Metrics (see metrics.py; exposed on /metrics + the Metrics page) ----
+GROK_LATENCY = metrics.histogram("gmf_grok_latency_seconds", "Grok chat completion latency", ("model", "outcome"))
+N8N_LATENCY = metrics.histogram("gmf_n8n_post_seconds", "n8n event post latency", ("event", "outcome"))
+N8N_POSTS = metrics.counter("gmf_n8n_posts_total", "n8n event posts by outcome", ("event", "outcome"))
+LIVEKIT_TOKENS = metrics.counter("gmf_livekit_tokens_total", "LiveKit tokens minted", ("room",))
+N8N_BATCH_ITEMS = metrics.histogram("gmf_n8n_batch_items", "Events per n8n batch envelope",
+                                    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+
 # ---- xAI (Grok) ----
 XAI_BASE_URL = os.getenv("XAI_BASE_URL", "https://api.x.ai/v1")
 XAI_MODEL = os.getenv("XAI_MODEL", "grok-4")
 
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate (~4 chars/token for English); no tokenizer download."""
+    return (len(text) + 3) // 4 if text else 0
+
+_CLIENTS: dict[tuple[str, str], OpenAI] = {}
+
 def _client() -> OpenAI:
+    """One client per key/base URL so its keep-alive pool (and prewarm.py's TLS handshake) is reused."""
     api_key = os.getenv("XAI_API_KEY")
     if not api_key:
         raise RuntimeError("XAI_API_KEY is not set. Add it to your .env / secrets.")
-    return OpenAI(api_key=api_key, base_url=XAI_BASE_URL)
+    client = _CLIENTS.get((api_key, XAI_BASE_URL))
+    metrics.cache_lookup("xai_client", client is not None)
+    if client is None:
+        client = _CLIENTS.setdefault((api_key, XAI_BASE_URL), OpenAI(api_key=api_key, base_url=XAI_BASE_URL))
+    return client
+
+# ---- Model router (latency classes, live per-model stats, fallback chains) ----
+# Callers declare a latency class: "interactive" (voice turns), "standard" (chat),
+# "batch" (summaries), or "auto" (short prompts -> interactive). Each class has a
+# preferred model chain, a p95 target and a per-attempt timeout. The first model in the
+# chain whose recent p95 / error rate is within target is used; on timeout or error the
+# call falls through to the next model. An explicit model= or no class skips routing.
+# Override with GMF_ROUTES='{"interactive": {"chain": ["grok-3-mini", "grok-4"], "p95_s": 3}}'.
+ROUTE_CLASSES = ("interactive", "standard", "batch")
+ROUTE_SHORT_TOKENS = int(os.getenv("GMF_ROUTE_SHORT_TOKENS", "200"))   # "auto": at most this -> interactive
+ROUTE_LONG_TOKENS = int(os.getenv("GMF_ROUTE_LONG_TOKENS", "4000"))    # interactive above this -> standard
+ROUTE_WINDOW_S = 600.0        # live stats only look at the last 10 minutes …
+ROUTE_MIN_SAMPLES = 5         # … and need this many samples before a model can be judged slow
+ROUTE_MAX_ERROR_RATE = 0.3
+ROUTE_LOG = os.getenv("GMF_ROUTE_LOG", "")   # optional JSONL file of routing decisions
+
+ROUTE_DECISIONS = metrics.counter("gmf_route_decisions_total", "Model routing decisions", ("cls", "model", "reason"))
+ROUTE_LATENCY = metrics.histogram("gmf_grok_route_seconds", "Grok latency per latency class, fallbacks included",
+                                  ("cls", "outcome"))
+
+def _route_config(raw: str) -> dict:
+    """Defaults merged with GMF_ROUTES; malformed classes or fields are skipped with a warning."""
+    cfg = {
+        "interactive": {"chain": ["grok-3-mini", XAI_MODEL], "p95_s": 3.0, "timeout_s": 8.0},
+        "standard": {"chain": [XAI_MODEL, "grok-3-mini"], "p95_s": 20.0, "timeout_s": 60.0},
+        "batch": {"chain": [XAI_MODEL], "p95_s": None, "timeout_s": None},
+    }
+    try:
+        overrides = json.loads(raw or "{}")
+    except ValueError:
+        overrides = None
+    if not isinstance(overrides, dict):
+        print("(warn) GMF_ROUTES is not a JSON object of classes; using defaults")
+        return cfg
+    for cls, over in overrides.items():
+        if not isinstance(over, dict):
+            print(f"(warn) GMF_ROUTES[{cls!r}] is not an object; ignored")
+            continue
+        entry = dict(cfg.get(cls, {"chain": [XAI_MODEL], "p95_s": None, "timeout_s": None}))
+        chain = over.get("chain", entry["chain"])
+        if isinstance(chain, list) and chain and all(isinstance(m, str) and m for m in chain):
+            entry["chain"] = chain
+        else:
+            print(f"(warn) GMF_ROUTES[{cls!r}].chain must be a non-empty list of model names; ignored")
+        for key in ("p95_s", "timeout_s"):
+            val = over.get(key, entry[key])
+            if val is None or (isinstance(val, (int, float)) and not isinstance(val, bool) and val > 0):
+                entry[key] = val
+            else:
+                print(f"(warn) GMF_ROUTES[{cls!r}].{key} must be a positive number or null; ignored")
+        cfg[cls] = entry
+    return cfg
+
+ROUTES = _route_config(os.getenv("GMF_ROUTES", ""))   # parsed once; class -> {chain, p95_s, timeout_s}
+
+class _ModelStats:
+    """Recent (ts, latency, ok) samples per model; p95 and error rate over ROUTE_WINDOW_S."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+
+    def observe(self, model: str, latency_s: float, ok: bool):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=100)).append((time.time(), latency_s, ok))
+
+    def summary(self, model: str) -> dict:
+        cutoff = time.time() - ROUTE_WINDOW_S
+        with self._lock:
+            recent = [s for s in self._samples.get(model, ()) if s[0] >= cutoff]
+        if not recent:
+            return {"n": 0, "p95_s": None, "error_rate": 0.0}
+        lat = sorted(s[1] for s in recent)
+        return {"n": len(recent), "p95_s": round(lat[min(len(lat) - 1, int(0.95 * len(lat)))], 3),
+                "error_rate": round(sum(not s[2] for s in recent) / len(recent), 3)}
+
+MODEL_STATS = _ModelStats()
+_ROUTES: deque = deque(maxlen=200)     # recent decisions for the Metrics page
+_ROUTE_LOG_LOCK = threading.Lock()
+
+def route(prompt_tokens: int, latency_class: str) -> tuple[str, list[str], str]:
+    """
+    Returns (class, ordered model chain, reason) for a request. reason is "preferred",
+    "error_rate: <first model>" / "over_target: <first model>" when it was passed over,
+    or "all_degraded" when no model in the chain is healthy and within target.
+    """
+    cfg = ROUTES
+    cls = latency_class
+    if cls == "auto":
+        cls = "interactive" if prompt_tokens <= ROUTE_SHORT_TOKENS else "standard"
+    if cls == "interactive" and prompt_tokens > ROUTE_LONG_TOKENS:
+        cls = "standard"
+    if cls not in cfg:
+        cls = "standard"
+    chain = list(dict.fromkeys(cfg[cls]["chain"]))      # de-duplicate, keep order
+    target = cfg[cls].get("p95_s")
+    stats = {m: MODEL_STATS.summary(m) for m in chain}
+    skipped = None     # why chain[0] was passed over: "error_rate" | "over_target"
+    for i, m in enumerate(chain):
+        st = stats[m]
+        if st["n"] >= ROUTE_MIN_SAMPLES and st["error_rate"] > ROUTE_MAX_ERROR_RATE:
+            skipped = skipped or "error_rate"
+            continue
+        if target and st["n"] >= ROUTE_MIN_SAMPLES and st["p95_s"] > target:
+            skipped = skipped or "over_target"
+            continue
+        reason = "preferred" if i == 0 else f"{skipped}: {chain[0]}"
+        return cls, [m] + chain[:i] + chain[i + 1:], reason
+    # Nothing healthy and within target: models under the error-rate cap first, then the
+    # fastest recent p95 (a model failing fast must not win; unknown models count as fast)
+    chain.sort(key=lambda m: (stats[m]["n"] >= ROUTE_MIN_SAMPLES and stats[m]["error_rate"] > ROUTE_MAX_ERROR_RATE,
+                              stats[m]["p95_s"] or 0.0))
+    return cls, chain, "all_degraded"
+
+def _log_route(entry: dict):
+    _ROUTES.append(entry)
+    ROUTE_DECISIONS.inc(cls=entry["cls"], model=entry["model"], reason=entry["reason"].split(":")[0])
+    if ROUTE_LOG:
+        with _ROUTE_LOG_LOCK:
+            try:
+                with open(ROUTE_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            except OSError as e:
+                print(f"(warn) route log failed: {e}")
+
+def recent_routes(n: int = 50) -> list[dict]:
+    return list(_ROUTES)[-n:][::-1]
 
 def grok_chat(prompt: str, *, model: Optional[str] = None,
-              temperature: float = 0.2, system: Optional[str] = None) -> str:
+              temperature: float = 0.2, system: Optional[str] = None,
+              history: Optional[list[dict]] = None, latency_class: Optional[str] = None) -> str:
+    """
+    history: prior {role, content} messages placed between system and prompt.
+    latency_class: interactive | standard | batch | auto — let the router pick the model
+    (ignored when model= is given).
+    """
     client = _client()
     msgs = []
     if system:
         msgs.append({"role": "system", "content": system})
+    if history:
+        msgs.extend({"role": m["role"], "content": m["content"]} for m in history)
     msgs.append({"role": "user", "content": prompt})
+    prompt_tokens = sum(estimate_tokens(m["content"]) for m in msgs)
+
+    if model or not latency_class:
+        cls, chain, reason, timeout = latency_class or "-", [model or XAI_MODEL], "pinned", None
+    else:
+        cls, chain, reason = route(prompt_tokens, latency_class)
+        timeout = ROUTES[cls].get("timeout_s")
+
+    attempts: list[dict] = []
+    reply, last_err = None, None
+    t_route = time.perf_counter()
     try:
-        resp = client.chat.completions.create(
-            model=model or XAI_MODEL, messages=msgs, temperature=temperature,
-        )
-        if not resp.choices or not resp.choices[0].message or not resp.choices[0].message.content:
-            raise RuntimeError("Empty response from Grok.")
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
-        raise RuntimeError(f"Grok chat failed: {e}")
+        for i, candidate in enumerate(chain):
+            # Session budget: may downgrade the model, or raise before the quota is overrun
+            model = usage.choose_model(candidate, prompt_tokens=prompt_tokens)
+            last = i == len(chain) - 1
+            started, t0 = time.time(), time.perf_counter()
+            # Non-final attempts: class timeout, no SDK retries, so the fallback kicks in quickly
+            c = client.with_options(timeout=timeout, max_retries=0) if timeout and not last else client
+            try:
+                with GROK_LATENCY.time(model=model):
+                    resp = c.chat.completions.create(model=model, messages=msgs, temperature=temperature)
+                    if not resp.choices or not resp.choices[0].message or not resp.choices[0].message.content:
+                        raise RuntimeError("Empty response from Grok.")
+                reply = resp.choices[0].message.content.strip()
+                _record_grok_usage(model, resp, msgs, reply)
+                return reply
+            except Exception as e:
+                last_err = e
+            finally:
+                elapsed = time.perf_counter() - t0
+                MODEL_STATS.observe(model, elapsed, reply is not None)
+                attempts.append({"model": model, "s": round(elapsed, 3), "ok": reply is not None})
+                if traffic.enabled():
+                    traffic.record("grok", started, elapsed, reply is not None,
+                                   **traffic.grok_shape(model, temperature, system, history, prompt, reply))
+        raise RuntimeError(f"Grok chat failed: {last_err}")
+    finally:
+        if attempts:
+            total = time.perf_counter() - t_route
+            ROUTE_LATENCY.observe(total, cls=cls, outcome="ok" if reply is not None else "error")
+            _log_route({"ts": round(time.time(), 3), "cls": cls, "prompt_tokens": prompt_tokens,
+                        "model": attempts[-1]["model"], "reason": reason if len(attempts) == 1 else "fallback",
+                        "attempts": attempts, "s": round(total, 3), "ok": reply is not None})
+
+def _record_grok_usage(model: str, resp, msgs: list[dict], reply: str):
+    """Billable tokens from the response's usage block (local estimate if it is missing)."""
+    u = getattr(resp, "usage", None)
+    prompt = getattr(u, "prompt_tokens", None)
+    total = getattr(u, "total_tokens", None)
+    if prompt is None:
+        prompt = sum(estimate_tokens(m["content"]) for m in msgs)
+        completion = estimate_tokens(reply)
+    else:
+        # total - prompt also counts reasoning tokens, which are billed as completion
+        completion = (total - prompt) if total is not None else (getattr(u, "completion_tokens", 0) or 0)
+    usage.record("grok", model, prompt_tokens=prompt, completion_tokens=completion)
 
 # ---- n8n event post (robust; prefers N8N_LOG_URL) ----
-def n8n_post(event: str, data: dict | None = None) -> dict:
+# Batch envelope (workflows that set it up, e.g. n8n/GMF Builder v1 (batch).json):
+#   request:  {"from", "ts", "batch": [{"id", "event", "ts", "data"}, …]}
+#   response: {"results": [{"id", "ok", "error"?, …}, …]}
+# N8N_BATCH=1 declares the workflow behind N8N_LOG_URL accepts it; N8N_BUILDER_BATCH_URL
+# points send_to_builder_batch at the batch Builder workflow. A 400/404/415/422 reply
+# means the envelope was rejected, so events are resent one by one. A 2xx reply without
+# per-item results means an old single-event workflow already ingested the whole
+# envelope as ONE event: nothing is resent (that would ingest everything twice), the
+# items come back as errors and the URL is sent single events from then on.
+N8N_BATCH = os.getenv("N8N_BATCH", "") not in ("", "0", "false")
+N8N_BATCH_MAX = int(os.getenv("N8N_BATCH_MAX", "50"))
+N8N_BATCH_WAIT_S = float(os.getenv("N8N_BATCH_WAIT_MS", "500")) / 1000
+
+_NO_BATCH: set[str] = set()     # URLs that answered a batch like an old single-event workflow
+_BATCH_REJECTED = (400, 404, 415, 422)
+
+def _n8n_url() -> str | None:
+    return os.getenv("N8N_LOG_URL") or os.getenv("N8N_WORKSPACE_URL")
+
+def _now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+def n8n_post(event: str, data: dict | None = None, *, url: str | None = None) -> dict:
     """
     Post a JSON event to n8n. Preference order:
       1) N8N_LOG_URL (logging/sessions)
       2) N8N_WORKSPACE_URL (legacy/general)
     Returns parsed JSON on success, else a structured error dict.
     """
-    url = os.getenv("N8N_LOG_URL") or os.getenv("N8N_WORKSPACE_URL")
+    url = url or _n8n_url()
     if not url:
+        N8N_POSTS.inc(event=event, outcome="unconfigured")
         return {"ok": False, "error": "No n8n URL configured (set N8N_LOG_URL or N8N_WORKSPACE_URL)"}
 
     payload = {
         "event": event,
         "from": "mind-fusion",
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "ts": _now_iso(),
     }
     if data is not None:
         payload["data"] = data
 
     resp = None
+    started, t0 = time.time(), time.perf_counter()
     try:
         resp = requests.post(url, json=payload, timeout=20)
         resp.raise_for_status()
+        N8N_LATENCY.observe(time.perf_counter() - t0, event=event, outcome="ok")
+        if traffic.enabled():
+            traffic.record("n8n", started, time.perf_counter() - t0, True, **traffic.n8n_shape(event, payload))
+        N8N_POSTS.inc(event=event, outcome="ok")
+        usage.record("n8n", event)
         try:
             return {"ok": True, "json": resp.json()}
         except ValueError:
             return {"ok": True, "text": resp.text}
     except requests.RequestException as e:
+        N8N_LATENCY.observe(time.perf_counter() - t0, event=event, outcome="error")
+        N8N_POSTS.inc(event=event, outcome="error")
+        if traffic.enabled():
+            traffic.record("n8n", started, time.perf_counter() - t0, False, **traffic.n8n_shape(event, payload))
         err = {"ok": False, "error": f"Request error: {e}"}
         if resp is not None:
             err["status"] = resp.status_code
             err["body"] = resp.text[:500]
         return err
     
+def n8n_post_batch(events: list[tuple[str, dict | None]], *, url: str | None = None,
+                   scopes: list[dict] | None = None) -> list[dict]:
+    """
+    Post several (event, data) pairs as one batch envelope. Returns one result dict per
+    event, in order ({ok, …} / {ok: False, error}). Uses n8n_post per event when batching
+    is off or the URL rejected an envelope before (see the note above N8N_BATCH).
+    scopes: per-event usage scope (session/page) when events were queued by other sessions.
+    """
+    url = url or _n8n_url()
+    if not events:
+        return []
+    single = lambda event, data: n8n_post(event, data, url=url)
+    if not url or not N8N_BATCH or url in _NO_BATCH:
+        return _each(single, events, scopes)
+    return _post_envelope(url, events, single=single, scopes=scopes)
+
+def _each(single, events: list[tuple[str, dict | None]], scopes: list[dict] | None) -> list[dict]:
+    """single(event, data) per event, each billed to its own usage scope."""
+    out = []
+    for i, (event, data) in enumerate(events):
+        with usage.scope(**(scopes[i] if scopes else {})):
+            out.append(single(event, data))
+    return out
+
+def _post_envelope(url: str, events: list[tuple[str, dict | None]], *, single,
+                   scopes: list[dict] | None = None) -> list[dict]:
+    """POST one batch envelope; single(event, data) -> dict resends an event when the envelope is rejected."""
+    items = [{"id": uuid.uuid4().hex[:12], "event": event, "ts": _now_iso(), "data": data}
+             for event, data in events]
+    payload = {"from": "mind-fusion", "ts": _now_iso(), "batch": items}
+    started, t0 = time.time(), time.perf_counter()
+    try:
+        resp = requests.post(url, json=payload, timeout=30)
+        if resp.status_code in _BATCH_REJECTED:
+            # Envelope refused before ingestion: safe to resend one by one
+            print(f"(warn) n8n batch rejected by {url} (status {resp.status_code}); sending single events")
+            _NO_BATCH.add(url)
+            return _each(single, events, scopes)
+        resp.raise_for_status()
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        results = body.get("results") if isinstance(body, dict) else None
+        if not isinstance(results, list):
+            # Old workflow ran once on the whole envelope; resending would ingest every event twice
+            print(f"(warn) {url} ingested a batch as one event (no per-item results); "
+                  f"not resending, single events from now on")
+            _NO_BATCH.add(url)
+            N8N_LATENCY.observe(time.perf_counter() - t0, event="batch", outcome="error")
+            for item in items:
+                N8N_POSTS.inc(event=item["event"], outcome="error")
+            return [{"ok": False, "legacy": True,
+                     "error": "Workflow took the batch envelope as one event (no per-item results); not resent"}
+                    for _ in items]
+    except requests.RequestException as e:
+        N8N_LATENCY.observe(time.perf_counter() - t0, event="batch", outcome="error")
+        for item in items:
+            N8N_POSTS.inc(event=item["event"], outcome="error")
+        return [{"ok": False, "error": f"Request error: {e}"} for _ in items]
+
+    N8N_LATENCY.observe(time.perf_counter() - t0, event="batch", outcome="ok")
+    N8N_BATCH_ITEMS.observe(len(items))
+    if traffic.enabled():
+        traffic.record("n8n", started, time.perf_counter() - t0, True,
+                       event="batch", items=len(items), bytes=len(resp.content))
+    for i, item in enumerate(items):   # one execution for the whole batch
+        usage.record("n8n", item["event"], cost_usd=usage.N8N_PRICE_PER_EXECUTION / len(items),
+                     scope=scopes[i] if scopes else None)
+    by_id = {r.get("id"): r for r in results if isinstance(r, dict)}
+    out = []
+    for item in items:
+        r = by_id.get(item["id"]) or {"ok": False, "error": "No result for batch item"}
+        N8N_POSTS.inc(event=item["event"], outcome="ok" if r.get("ok") else "error")
+        out.append(r)
+    return out
+
+# ---- n8n background batcher (fire-and-forget events from the UI) ----
+_EMIT_QUEUE: list[tuple[str, dict | None, dict]] = []   # (event, data, caller's usage scope)
+_EMIT_COND = threading.Condition()
+_EMITTER: threading.Thread | None = None
+
+def n8n_emit(event: str, data: dict | None = None):
+    """Queue an event; a side thread flushes up to N8N_BATCH_MAX per request every N8N_BATCH_WAIT_MS."""
+    global _EMITTER
+    with _EMIT_COND:
+        _EMIT_QUEUE.append((event, data, usage.current()))   # the batcher thread has no scope of its own
+        if _EMITTER is None or not _EMITTER.is_alive():
+            _EMITTER = threading.Thread(target=_emit_loop, name="gmf-n8n-batcher", daemon=True)
+            _EMITTER.start()
+        if len(_EMIT_QUEUE) >= N8N_BATCH_MAX:
+            _EMIT_COND.notify()
+
+def n8n_flush() -> list[dict]:
+    """Send everything queued by n8n_emit now (e.g. before exit). Returns the per-event results."""
+    with _EMIT_COND:
+        pending = _EMIT_QUEUE[:]
+        del _EMIT_QUEUE[:]
+    out = []
+    for i in range(0, len(pending), N8N_BATCH_MAX):
+        out.extend(_post_queued(pending[i:i + N8N_BATCH_MAX]))
+    return out
+
+def _post_queued(batch: list[tuple[str, dict | None, dict]]) -> list[dict]:
+    return n8n_post_batch([(event, data) for event, data, _ in batch], scopes=[sc for _, _, sc in batch])
+
+def _emit_loop():
+    while True:
+        with _EMIT_COND:
+            if len(_EMIT_QUEUE) < N8N_BATCH_MAX:
+                _EMIT_COND.wait(N8N_BATCH_WAIT_S)
+            batch = _EMIT_QUEUE[:N8N_BATCH_MAX]
+            del _EMIT_QUEUE[:N8N_BATCH_MAX]
+        if batch:
+            for (event, _, _), r in zip(batch, _post_queued(batch)):
+                if not r.get("ok"):
+                    print(f"(warn) n8n event {event} failed: {r.get('error')}")
+
+# ---- n8n Builder client (GMF Builder v1 webhook; moved from app.py so workers can call it) ----
+def _builder_payload(repo_name: str, notes: str = "", priority: str = "normal", readme: str = "") -> dict:
+    return {
+        "repo_name": repo_name.strip(),
+        "private": True,
+        "description": f"Created by GMF Builder v1 — priority={priority}" + (f" | {notes}" if notes else ""),
+        "readme": readme or f"# {repo_name}\n\nBootstrapped by GMF Builder v1."
+    }
+
+def send_to_builder(repo_name: str, notes: str, priority: str, readme: str, *, url: str | None = None):
+    """Send structured build request to n8n Builder webhook. Returns (ok, data)."""
+    url = url or os.getenv("N8N_BUILDER_URL")
+    if not url:
+        return False, "Missing N8N_BUILDER_URL in Streamlit Cloud Secrets."
+    return _builder_post(_builder_payload(repo_name, notes, priority, readme), url)
+
+def send_to_builder_batch(specs: list[dict], *, url: str | None = None,
+                          single_url: str | None = None) -> list[tuple[bool, dict | str]]:
+    """
+    Several build specs ({repo_name, notes?, priority?, readme?}) as one envelope of
+    build_request events to the batch Builder workflow (n8n/GMF Builder v1 (batch).json,
+    webhook gmf/build-batch, set as N8N_BUILDER_BATCH_URL). Returns one (ok, data) per
+    spec like send_to_builder; without a batch URL, or if the envelope is rejected,
+    each spec goes to the single-spec webhook (N8N_BUILDER_URL).
+    """
+    url = url or os.getenv("N8N_BUILDER_BATCH_URL")
+    single_url = single_url or os.getenv("N8N_BUILDER_URL")
+    if not specs:
+        return []
+    if not url or url in _NO_BATCH:
+        return [send_to_builder(s["repo_name"], s.get("notes", ""), s.get("priority", "normal"),
+                                s.get("readme", ""), url=single_url) for s in specs]
+
+    def single(_event: str, data: dict) -> dict:
+        if not single_url:
+            return {"ok": False, "result": "Missing N8N_BUILDER_URL in Streamlit Cloud Secrets."}
+        ok, res = _builder_post(data, single_url)
+        return {"ok": ok, "result": res}
+
+    events = [("build_request", _builder_payload(s["repo_name"], s.get("notes", ""), s.get("priority", "normal"),
+                                                 s.get("readme", ""))) for s in specs]
+    return [(bool(r.get("ok")), r.get("result", r)) for r in _post_envelope(url, events, single=single)]
+
+def _builder_post(payload: dict, url: str):
+    try:
+        resp = requests.post(
+            url,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=20,
+        )
+        status = resp.status_code
+        text = resp.text
+    except requests.RequestException as e:
+        return False, f"Request error: {e}"
+
+    try:
+        data = resp.json()
+    except Exception:
+        data = {"raw": text, "status": status}
+
+    if 200 <= status < 300:
+        return True, data
+    else:
+        return False, data
+
 # ---- Builder helper (sends structured build request to n8n) ----
 def builder_task(spec: str, *, priority: str = "normal", notes: str = "") -> dict:
     if not spec.strip():
@@ -116,4 +543,5 @@ def livekit_token(room: str, identity: str, name: str | None = None, *, ttl_seco
 
     # HS256 with your API SECRET. (No kid header required for v2)
     token = jwt.encode(payload, api_secret, algorithm="HS256")
+    LIVEKIT_TOKENS.inc(room=room)
     return {"url": lk_url, "token": token}
\ No newline at end of file
@@ -0,0 +1,280 @@
+# traffic.py — GrokMind Fusion traffic capture + replay
+# Opt-in capture (GMF_CAPTURE=trace.jsonl) of every upstream call made through
+# tools.grok_chat, voice.transcribe_async/transcribe_file and tools.n8n_post: one
+# compact JSON line per call with its shape (sizes, model, event name — never the
+# prompt, transcript or payload contents), latency and the gap since the previous
+# call. The replayer re-drives the same code paths against standins.py at 1x or
+# accelerated speed and reports latency distributions; compare two runs per release.
+#
+#   GMF_CAPTURE=trace.jsonl streamlit run app.py
+#   python traffic.py summary trace.jsonl
+#   python traffic.py replay trace.jsonl --speed 10 --out v1.4.json
+#   python traffic.py compare v1.3.json v1.4.json --fail-over 15
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CAPTURE_PATH = os.getenv("GMF_CAPTURE", "")
+KINDS = ("grok", "transcribe", "n8n")
+
+_lock = threading.Lock()
+_file = None          # (pid, handle): reopened after fork so worker processes append safely
+_last_start = 0.0
+
+# ---------------------------
+# Capture
+# ---------------------------
+def enabled() -> bool:
+    return bool(CAPTURE_PATH)
+
+def record(kind: str, started: float, latency_s: float, ok: bool, **shape):
+    """Append one redacted call record. `started` is time.time() at call start; shape holds sizes only."""
+    global _file, _last_start
+    if not CAPTURE_PATH:
+        return
+    with _lock:
+        gap = started - _last_start if _last_start else 0.0
+        _last_start = max(_last_start, started)
+        rec = {"k": kind, "t": round(started, 3), "gap": round(max(gap, 0.0), 3),
+               "lat": round(latency_s, 4), "ok": ok, **shape}
+        try:
+            if _file is None or _file[0] != os.getpid():
+                _file = (os.getpid(), open(CAPTURE_PATH, "a", buffering=1, encoding="utf-8"))
+            _file[1].write(json.dumps(rec, separators=(",", ":")) + "\n")
+        except OSError as e:
+            print(f"(warn) traffic capture failed: {e}")
+
+def grok_shape(model: str, temperature: float, system: str | None, history: list | None,
+               prompt: str, reply: str | None) -> dict:
+    return {
+        "model": model, "temp": temperature,
+        "sys_chars": len(system or ""),
+        "hist_msgs": len(history or ()),
+        "hist_chars": sum(len(m.get("content") or "") for m in history or ()),
+        "prompt_chars": len(prompt or ""),
+        "reply_chars": len(reply or ""),
+    }
+
+def n8n_shape(event: str, payload: dict) -> dict:
+    data = payload.get("data")
+    return {
+        "event": event,
+        "bytes": len(json.dumps(payload, default=str)),
+        "keys": sorted(data)[:20] if isinstance(data, dict) else [],
+    }
+
+def transcribe_shape(path: str, audio_bytes: int, res: dict | None) -> dict:
+    words = (res or {}).get("words") or ()
+    return {
+        "suffix": os.path.splitext(path)[1].lower(),
+        "bytes": audio_bytes,
+        "words": len(words),
+        "audio_ms": words.duration_ms() if hasattr(words, "duration_ms") else 0,
+    }
+
+# ---------------------------
+# Trace reading
+# ---------------------------
+def load(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f if line.strip()]
+    recs.sort(key=lambda r: r["t"])
+    return recs
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    s = sorted(values)
+    return round(s[min(len(s) - 1, int(q * len(s)))], 4)
+
+def distribution(values: list[float]) -> dict:
+    return {
+        "n": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else None,
+        "p50": _pct(values, 0.50), "p95": _pct(values, 0.95), "p99": _pct(values, 0.99),
+        "max": round(max(values), 4) if values else None,
+    }
+
+def summary(recs: list[dict]) -> dict:
+    """Per-kind recorded latency distribution, error rate and load shape."""
+    out = {"calls": len(recs), "span_s": round(recs[-1]["t"] - recs[0]["t"], 3) if recs else 0.0, "kinds": {}}
+    for kind in KINDS:
+        rs = [r for r in recs if r["k"] == kind]
+        if rs:
+            gaps = [b["t"] - a["t"] for a, b in zip(rs, rs[1:])]
+            out["kinds"][kind] = {
+                "latency": distribution([r["lat"] for r in rs]),
+                "errors": sum(not r["ok"] for r in rs),
+                "gap": distribution(gaps),
+            }
+    return out
+
+# ---------------------------
+# Replay
+# ---------------------------
+def _hint(rec: dict, latency_scale: float) -> str:
+    h = f"[gmf-replay delay={rec['lat'] * latency_scale:.4f}"
+    if rec["k"] == "grok":
+        h += f" reply_chars={rec.get('reply_chars', 0)}"
+    return h + "]"
+
+def _pad(hint: str, n: int) -> str:
+    return hint + " " + "x" * max(n - len(hint) - 1, 0)
+
+def _replay_one(rec: dict, latency_scale: float, tmpdir: str) -> tuple[float, bool]:
+    """Re-drive one recorded call through the real client code. Returns (latency_s, ok)."""
+    import tools
+    import voice
+    hint = _hint(rec, latency_scale)
+    t0 = time.perf_counter()
+    if rec["k"] == "grok":
+        history = [{"role": "user" if i % 2 == 0 else "assistant", "content": "h" * (rec["hist_chars"] // rec["hist_msgs"])}
+                   for i in range(rec.get("hist_msgs", 0))]
+        try:
+            tools.grok_chat(_pad(hint, rec.get("prompt_chars", 0)), model=rec.get("model"),
+                            temperature=rec.get("temp", 0.2),
+                            system=("s" * rec["sys_chars"]) if rec.get("sys_chars") else None,
+                            history=history or None)
+            ok = True
+        except RuntimeError:
+            ok = False
+    elif rec["k"] == "n8n":
+        data = {k: "" for k in rec.get("keys", [])}
+        data["_replay"] = _pad(hint, max(rec.get("bytes", 0) - 120, 0))
+        ok = bool(tools.n8n_post(rec.get("event", "replay"), data).get("ok"))
+    else:
+        # Opaque (non-PCM) suffix so upload.py sends the recorded byte count as-is
+        path = os.path.join(tmpdir, f"{time.monotonic_ns()}.bin")
+        with open(path, "wb") as f:
+            f.write(_pad(hint, rec.get("bytes", 0)).encode("ascii"))
+        try:
+            ok = "error" not in voice.transcribe_file(path, timeout=600)
+        finally:
+            os.remove(path)
+    return time.perf_counter() - t0, ok
+
+def replay(recs: list[dict], *, speed: float = 1.0, latency_scale: float = 1.0,
+           concurrency: int = 16, label: str = "") -> dict:
+    """
+    Re-issue `recs` with their original inter-arrival gaps divided by `speed`, through
+    tools/voice pointed at in-process stand-ins whose latency is the recorded latency
+    × latency_scale. Returns per-kind client latency distributions and schedule lag.
+    Transcribe latency includes voice.py's polling on top of the recorded time, so
+    compare replays with replays rather than with the recorded numbers.
+    """
+    global CAPTURE_PATH
+    import tools
+    import voice
+    import usage
+    from standins import AssemblyAIStandIn, N8NStandIn, XAIStandIn
+
+    CAPTURE_PATH = ""   # never capture the replay itself
+    results: dict[str, list] = {k: [] for k in KINDS}
+    errors = {k: 0 for k in KINDS}
+    lags: list[float] = []
+    res_lock = threading.Lock()
+
+    with XAIStandIn() as xai, N8NStandIn() as n8n, AssemblyAIStandIn() as sa, \
+            tempfile.TemporaryDirectory(prefix="gmf-replay-") as tmpdir:
+        os.environ.update(XAI_API_KEY="replay", N8N_LOG_URL=f"{n8n.url}/webhook/log",
+                          ASSEMBLYAI_API_KEY="replay", ASSEMBLYAI_BASE_URL=sa.url)
+        tools.XAI_BASE_URL = f"{xai.url}/v1"
+        voice._AAI_KEY = None   # re-read key/base URL on the next call
+        # Replayed calls are billed by the real code paths; keep them out of gmf_usage.db
+        saved_usage_db, usage.DB_PATH = usage.DB_PATH, os.path.join(tmpdir, "usage.db")
+
+        def run(rec: dict, due: float):
+            lag = time.perf_counter() - due
+            lat, ok = _replay_one(rec, latency_scale, tmpdir)
+            with res_lock:
+                lags.append(lag)
+                results[rec["k"]].append(lat)
+                errors[rec["k"]] += not ok
+
+        start = time.perf_counter()
+        t_first = recs[0]["t"] if recs else 0.0
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="gmf-replay") as pool:
+                for rec in recs:
+                    due = start + (rec["t"] - t_first) / speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    pool.submit(run, rec, due)
+        finally:
+            usage.DB_PATH = saved_usage_db
+        wall = time.perf_counter() - start
+
+    return {
+        "label": label, "calls": len(recs), "speed": speed, "latency_scale": latency_scale,
+        "wall_s": round(wall, 3),
+        "schedule_lag": distribution(lags),
+        "kinds": {k: {"latency": distribution(v), "errors": errors[k],
+                      "recorded": distribution([r["lat"] for r in recs if r["k"] == k])}
+                  for k, v in results.items() if v},
+    }
+
+def compare(base: dict, new: dict, *, fail_over_pct: float | None = None) -> tuple[list[str], bool]:
+    """Side-by-side p50/p95/p99 per kind. Returns (lines, regressed) — regressed if any p95 grew > fail_over_pct."""
+    lines = [f"{'kind':<11}{'stat':<6}{base.get('label') or 'base':>12}{new.get('label') or 'new':>12}{'change':>10}"]
+    regressed = False
+    for kind in KINDS:
+        a = base["kinds"].get(kind, {}).get("latency")
+        b = new["kinds"].get(kind, {}).get("latency")
+        if not a or not b:
+            continue
+        for stat in ("p50", "p95", "p99"):
+            pct = (b[stat] - a[stat]) / a[stat] * 100 if a[stat] else 0.0
+            lines.append(f"{kind:<11}{stat:<6}{a[stat]:>12.4f}{b[stat]:>12.4f}{pct:>+9.1f}%")
+            if stat == "p95" and fail_over_pct is not None and pct > fail_over_pct:
+                regressed = True
+        ea, eb = base["kinds"][kind]["errors"], new["kinds"][kind]["errors"]
+        if ea or eb:
+            lines.append(f"{kind:<11}{'err':<6}{ea:>12}{eb:>12}")
+    return lines, regressed
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="GrokMind Fusion traffic capture/replay")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("summary", help="recorded latency and load shape of a trace")
+    s.add_argument("trace")
+    r = sub.add_parser("replay", help="re-drive a trace against local stand-ins")
+    r.add_argument("trace")
+    r.add_argument("--speed", type=float, default=1.0, help="divide inter-arrival gaps by this")
+    r.add_argument("--latency-scale", type=float, default=1.0, help="stand-in latency = recorded × this")
+    r.add_argument("--concurrency", type=int, default=16)
+    r.add_argument("--label", default="")
+    r.add_argument("--out", help="write the report JSON here")
+    c = sub.add_parser("compare", help="compare two replay reports")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--fail-over", type=float, help="exit 1 if any p95 grew by more than this %%")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "summary":
+        print(json.dumps(summary(load(args.trace)), indent=2))
+    elif args.cmd == "replay":
+        report = replay(load(args.trace), speed=args.speed, latency_scale=args.latency_scale,
+                        concurrency=args.concurrency, label=args.label or os.path.basename(args.trace))
+        text = json.dumps(report, indent=2)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(text)
+        print(text)
+    else:
+        with open(args.base, encoding="utf-8") as fa, open(args.new, encoding="utf-8") as fb:
+            lines, regressed = compare(json.load(fa), json.load(fb), fail_over_pct=args.fail_over)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,211 @@
+# transcript.py — GrokMind Fusion compact word timings
+# Columnar, array-backed storage for AssemblyAI word lists: a string table plus
+# parallel start/end/confidence columns. Behaves like a read-only list of
+# {text, start, end, confidence} dicts for existing callers, supports vectorised
+# time-range / confidence queries, and serialises to a compact binary blob.
+
+from __future__ import annotations
+
+import sys
+import math
+import zlib
+import bisect
+import struct
+from array import array
+from collections.abc import Sequence
+from typing import Iterable
+
+try:  # optional: vectorised filters when NumPy is installed
+    import numpy as np
+except Exception:  # pragma: no cover - numpy is not a hard dependency
+    np = None
+
+_MISSING = -1            # start/end sentinel for "no timing"
+_MAGIC = b"GMFW"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBII")   # magic, version, flags, n_words, n_strings
+_FLAG_ZLIB = 1
+
+class WordTable(Sequence):
+    """Read-only sequence of word dicts backed by parallel arrays (times in ms)."""
+
+    __slots__ = ("strings", "text_idx", "start", "end", "confidence")
+
+    def __init__(self, strings: list[str] | None = None, text_idx: array | None = None,
+                 start: array | None = None, end: array | None = None, confidence: array | None = None):
+        self.strings = strings if strings is not None else []
+        self.text_idx = text_idx if text_idx is not None else array("I")
+        self.start = start if start is not None else array("i")
+        self.end = end if end is not None else array("i")
+        self.confidence = confidence if confidence is not None else array("f")
+
+    # ---- construction ----
+    @classmethod
+    def from_words(cls, words: Iterable) -> "WordTable":
+        """Build from dicts or AssemblyAI Word objects (text/start/end/confidence)."""
+        table = cls()
+        intern: dict[str, int] = {}
+        strings, idx, start, end, conf = table.strings, table.text_idx, table.start, table.end, table.confidence
+        for w in words or ():
+            get = w.get if isinstance(w, dict) else (lambda k, _w=w: getattr(_w, k, None))
+            text = get("text") or ""
+            i = intern.get(text)
+            if i is None:
+                i = intern[text] = len(strings)
+                strings.append(text)
+            idx.append(i)
+            s, e, c = get("start"), get("end"), get("confidence")
+            start.append(_MISSING if s is None else int(s))
+            end.append(_MISSING if e is None else int(e))
+            conf.append(math.nan if c is None else float(c))
+        return table
+
+    # ---- Sequence protocol (dict-compatible view) ----
+    def __len__(self) -> int:
+        return len(self.text_idx)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(*i.indices(len(self))))
+        s, e, c = self.start[i], self.end[i], self.confidence[i]
+        return {
+            "text": self.strings[self.text_idx[i]],
+            "start": None if s == _MISSING else s,
+            "end": None if e == _MISSING else e,
+            "confidence": None if c != c else round(c, 4),   # NaN -> None; float32 -> 4 dp
+        }
+
+    def __repr__(self) -> str:
+        return f"WordTable({len(self)} words, {len(self.strings)} distinct, {self.nbytes()} bytes)"
+
+    def to_list(self) -> list[dict]:
+        """Plain list of dicts (JSON-serialisable, e.g. for n8n payloads)."""
+        return [self[i] for i in range(len(self))]
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.strings[i] for i in self.text_idx)
+
+    # ---- queries ----
+    def take(self, indices) -> "WordTable":
+        """New table with the given word indices (string table is shared, not copied)."""
+        indices = list(indices)
+        return WordTable(
+            self.strings,
+            array("I", (self.text_idx[i] for i in indices)),
+            array("i", (self.start[i] for i in indices)),
+            array("i", (self.end[i] for i in indices)),
+            array("f", (self.confidence[i] for i in indices)),
+        )
+
+    def between(self, t0_ms: int, t1_ms: int) -> "WordTable":
+        """Words starting in [t0_ms, t1_ms). Assumes words are in time order (AssemblyAI's are)."""
+        lo = bisect.bisect_left(self.start, t0_ms)
+        hi = bisect.bisect_left(self.start, t1_ms, lo)
+        return WordTable(self.strings, self.text_idx[lo:hi], self.start[lo:hi],
+                         self.end[lo:hi], self.confidence[lo:hi])
+
+    def low_confidence(self, threshold: float = 0.5) -> list[int]:
+        """Indices of words with confidence below threshold (NaN/missing excluded)."""
+        if np is not None and len(self):
+            conf = np.frombuffer(self.confidence, dtype=np.float32)
+            return np.flatnonzero(conf < threshold).tolist()
+        return [i for i, c in enumerate(self.confidence) if c < threshold]
+
+    def duration_ms(self) -> int:
+        ends = [e for e in self.end[-8:] if e != _MISSING]
+        return max(ends) if ends else 0
+
+    def nbytes(self) -> int:
+        """Approximate memory footprint (arrays + string table)."""
+        cols = sum(a.itemsize * len(a) for a in (self.text_idx, self.start, self.end, self.confidence))
+        return cols + sys.getsizeof(self.strings) + sum(sys.getsizeof(s) for s in self.strings)
+
+    # ---- binary form ----
+    def to_bytes(self, *, compress: bool = True) -> bytes:
+        """Little-endian header + length-prefixed string table + raw columns (optionally zlib)."""
+        encoded = [w.encode("utf-8") for w in self.strings]
+        body = b"".join([
+            _le_bytes(array("I", map(len, encoded))),
+            *encoded,
+            *(_le_bytes(a) for a in (self.text_idx, self.start, self.end, self.confidence)),
+        ])
+        flags = 0
+        if compress:
+            body, flags = zlib.compress(body, 6), _FLAG_ZLIB
+        return _HEADER.pack(_MAGIC, _VERSION, flags, len(self), len(self.strings)) + body
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "WordTable":
+        magic, version, flags, n, n_strings = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a GMF word table blob")
+        body = blob[_HEADER.size:]
+        if flags & _FLAG_ZLIB:
+            body = zlib.decompress(body)
+        lengths, pos = _read_col(body, 0, "I", n_strings)
+        strings = []
+        for size in lengths:
+            strings.append(body[pos:pos + size].decode("utf-8"))
+            pos += size
+        cols = []
+        for code in ("I", "i", "i", "f"):
+            col, pos = _read_col(body, pos, code, n)
+            cols.append(col)
+        return cls(strings, *cols)
+
+def _read_col(body: bytes, pos: int, code: str, n: int) -> tuple[array, int]:
+    a = array(code)
+    size = a.itemsize * n
+    a.frombytes(body[pos:pos + size])
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a, pos + size
+
+def _le_bytes(a: array) -> bytes:
+    if sys.byteorder == "little":
+        return a.tobytes()
+    b = array(a.typecode, a)
+    b.byteswap()
+    return b.tobytes()
+
+# ---------------------------
+# Memory benchmark: python transcript.py [n_words]
+# ---------------------------
+def bench_memory(n_words: int = 40_000) -> dict:
+    """Compare a list of word dicts with a WordTable (~2 h of speech at 40k words)."""
+    import json
+    import random
+    import tracemalloc
+
+    rnd = random.Random(3)
+    vocab = [f"word{i}" for i in range(3000)]
+
+    def make():
+        t = 0
+        for _ in range(n_words):
+            yield {"text": rnd.choice(vocab), "start": t, "end": t + 240, "confidence": rnd.random()}
+            t += 300
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    dicts = list(make())
+    dict_bytes = tracemalloc.get_traced_memory()[0] - base
+    base = tracemalloc.get_traced_memory()[0]
+    table = WordTable.from_words(dicts)
+    table_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    return {
+        "words": n_words,
+        "dict_list_bytes": dict_bytes,
+        "word_table_bytes": table_bytes,
+        "memory_ratio": round(dict_bytes / table_bytes, 1) if table_bytes else None,
+        "json_bytes": len(json.dumps(dicts)),
+        "binary_bytes": len(table.to_bytes(compress=False)),
+        "binary_zlib_bytes": len(table.to_bytes()),
+    }
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(bench_memory(int(sys.argv[1]) if len(sys.argv) > 1 else 40_000), indent=2))
@@ -0,0 +1,224 @@
+# upload.py — GrokMind Fusion audio upload stage
+# Transcodes PCM (WAV/AIFF) to FLAC or Opus in-process before upload, then sends it
+# to AssemblyAI: one streamed request with retries, or — for endpoints that accept
+# ranged chunk sessions (GMF_UPLOAD_RANGED=1, e.g. an upload relay) — parallel
+# Content-Range chunks with resume. Reports bytes saved and upload time per file.
+#
+#   GMF_UPLOAD_FORMAT=flac | opus | raw   (default flac — lossless at the source bit depth)
+#   GMF_UPLOAD_MIN_QUALITY=0.7            (opus only: quality floor 0..1)
+#   GMF_UPLOAD_CHUNK_MB=4  GMF_UPLOAD_WORKERS=4  GMF_UPLOAD_RETRIES=3
+
+from __future__ import annotations
+
+import io
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import metrics
+
+try:  # optional: libsndfile bindings for in-process FLAC/Opus encoding
+    import soundfile as sf
+except Exception:  # pragma: no cover - falls back to sending the original bytes
+    sf = None
+
+UPLOAD_FORMAT = os.getenv("GMF_UPLOAD_FORMAT", "flac").lower()
+MIN_QUALITY = float(os.getenv("GMF_UPLOAD_MIN_QUALITY", "0.7"))
+CHUNK_BYTES = int(float(os.getenv("GMF_UPLOAD_CHUNK_MB", "4")) * 1024 * 1024)
+WORKERS = int(os.getenv("GMF_UPLOAD_WORKERS", "4"))
+RETRIES = int(os.getenv("GMF_UPLOAD_RETRIES", "3"))
+RANGED = os.getenv("GMF_UPLOAD_RANGED", "") not in ("", "0", "false")
+
+PCM_SUFFIXES = (".wav", ".wave", ".aif", ".aiff", ".aifc")
+# Source subtype -> the FLAC subtype that holds it bit-exactly (32-bit int / float PCM has none)
+FLAC_SUBTYPES = {"PCM_U8": "PCM_S8", "PCM_S8": "PCM_S8", "PCM_16": "PCM_16", "PCM_24": "PCM_24"}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)   # libopus accepts only these
+
+UPLOAD_SECONDS = metrics.histogram("gmf_upload_seconds", "Audio upload time", ("mode", "outcome"))
+ENCODE_SECONDS = metrics.histogram("gmf_upload_encode_seconds", "In-process audio transcode time", ("format",))
+BYTES_SAVED = metrics.counter("gmf_upload_bytes_saved_total", "Bytes not sent thanks to transcoding")
+BYTES_SENT = metrics.counter("gmf_upload_bytes_sent_total", "Audio bytes uploaded")
+
+# Shared keep-alive pool for all upload requests (prewarm.py opens it early via warm())
+_HTTP = requests.Session()
+
+# file digest -> ranged session id, so a failed upload resumes instead of restarting
+_SESSIONS: dict[str, str] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+# ---------------------------
+# Transcode
+# ---------------------------
+def compress(path: str, *, fmt: str = UPLOAD_FORMAT, min_quality: float = MIN_QUALITY) -> tuple[bytes, dict]:
+    """
+    Return (bytes_to_send, info). PCM inputs are re-encoded as FLAC at the source bit
+    depth (lossless) or Opus at quality >= min_quality; anything else (mp3/m4a, 32-bit
+    or float PCM for FLAC, no soundfile, encoder error, or no size win) is sent as-is.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    info = {"format": "original", "original_bytes": len(raw), "encode_s": 0.0}
+    if fmt == "raw" or sf is None or not path.lower().endswith(PCM_SUFFIXES):
+        return raw, info
+
+    t0 = time.perf_counter()
+    try:
+        src = sf.info(io.BytesIO(raw))
+        info["subtype"] = src.subtype
+        opus = fmt == "opus" and src.samplerate in OPUS_RATES
+        flac_subtype = FLAC_SUBTYPES.get(src.subtype)
+        if not opus and flac_subtype is None:
+            # FLAC cannot hold this losslessly (also the Opus fallback): send the original
+            return raw, info
+        # int32 carries 8/16/24-bit samples exactly; libsndfile rescales on write
+        data, rate = sf.read(io.BytesIO(raw), dtype="float32" if opus else "int32", always_2d=True)
+        out = io.BytesIO()
+        if opus:
+            quality = max(min_quality, 0.0)
+            sf.write(out, data, rate, format="OGG", subtype="OPUS", compression_level=1.0 - min(quality, 1.0))
+            encoded = "opus"
+        else:
+            sf.write(out, data, rate, format="FLAC", subtype=flac_subtype, compression_level=0.5)
+            encoded = "flac"
+        blob = out.getvalue()
+    except Exception as e:
+        info["encode_error"] = str(e)
+        return raw, info
+    info["encode_s"] = round(time.perf_counter() - t0, 3)
+    ENCODE_SECONDS.observe(info["encode_s"], format=encoded)
+    if len(blob) >= len(raw):
+        return raw, info
+    info["format"] = encoded
+    return blob, info
+
+# ---------------------------
+# Upload
+# ---------------------------
+def upload_file(path: str, *, base_url: str, api_key: str) -> tuple[str, dict]:
+    """
+    Compress + upload a local file. Returns (upload_url, stats) where stats has
+    original_bytes, sent_bytes, saved_bytes, format, encode_s, upload_s, mode, chunks, retries.
+    """
+    data, stats = compress(path)
+    stats.update(sent_bytes=len(data), saved_bytes=stats["original_bytes"] - len(data),
+                 file=os.path.basename(path), retries=0)
+    headers = {"authorization": api_key}
+    mode = "ranged" if RANGED and len(data) > CHUNK_BYTES else "single"
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        if mode == "ranged":
+            url = _upload_ranged(data, base_url.rstrip("/"), headers, stats)
+        else:
+            url = _upload_single(data, base_url.rstrip("/"), headers, stats)
+        outcome = "ok"
+    finally:
+        stats["upload_s"] = round(time.perf_counter() - t0, 3)
+        stats["mode"] = mode
+        UPLOAD_SECONDS.observe(stats["upload_s"], mode=mode, outcome=outcome)
+    BYTES_SENT.inc(len(data))
+    BYTES_SAVED.inc(max(stats["saved_bytes"], 0))
+    return url, stats
+
+def warm(base_url: str, api_key: str):
+    """Open the TLS connection upload_file() will reuse (cheap authenticated GET)."""
+    _HTTP.get(f"{base_url.rstrip('/')}/v2/transcript", params={"limit": 1},
+              headers={"authorization": api_key}, timeout=10)
+
+def _retryable(e: requests.RequestException) -> bool:
+    """Connection drops, timeouts, 5xx and 429 are worth another try; other 4xx (bad key, bad request) are not."""
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = e.response.status_code if e.response is not None else None
+    return status is not None and (status >= 500 or status == 429)
+
+def _upload_single(data: bytes, base_url: str, headers: dict, stats: dict) -> str:
+    """AssemblyAI /v2/upload: one streamed body; retried from the start on failure."""
+    def body():
+        for i in range(0, len(data), 256 * 1024):
+            yield data[i:i + 256 * 1024]
+
+    last = None
+    for attempt in range(RETRIES):
+        try:
+            resp = _HTTP.post(f"{base_url}/v2/upload", data=body(), headers=headers, timeout=120)
+            resp.raise_for_status()
+            stats["chunks"] = 1
+            return resp.json()["upload_url"]
+        except requests.RequestException as e:
+            if not _retryable(e):
+                raise RuntimeError(f"Upload failed: {e}") from e
+            last = e
+            if attempt < RETRIES - 1:
+                stats["retries"] += 1
+                time.sleep(min(2 ** attempt, 8))
+    raise RuntimeError(f"Upload failed after {RETRIES} attempts: {last}")
+
+def _upload_ranged(data: bytes, base_url: str, headers: dict, stats: dict) -> str:
+    """
+    Chunk-session protocol (relay / stand-in):
+      POST /v2/upload/sessions {size}                 -> {session}
+      GET  /v2/upload/sessions/{id}                   -> {received: [[start, end], …]}
+      PUT  /v2/upload/sessions/{id}  Content-Range     (chunks in parallel)
+      POST /v2/upload/sessions/{id}/complete          -> {upload_url}
+    Chunks already received (earlier failed attempt of the same bytes) are skipped.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    total = len(data)
+    ranges = [(i, min(i + CHUNK_BYTES, total)) for i in range(0, total, CHUNK_BYTES)]
+    with _SESSIONS_LOCK:
+        sid = _SESSIONS.get(digest)
+    received: set[tuple[int, int]] = set()
+    if sid:
+        r = _HTTP.get(f"{base_url}/v2/upload/sessions/{sid}", headers=headers, timeout=20)
+        if r.ok:
+            received = {tuple(x) for x in r.json().get("received", [])}
+            stats["resumed_bytes"] = sum(b - a for a, b in received)
+        else:
+            sid = None
+    if not sid:
+        r = _HTTP.post(f"{base_url}/v2/upload/sessions", json={"size": total, "sha256": digest},
+                          headers=headers, timeout=20)
+        r.raise_for_status()
+        sid = r.json()["session"]
+        with _SESSIONS_LOCK:
+            _SESSIONS[digest] = sid
+
+    failed: list[str] = []   # first chunk that gave up; in-flight chunks stop retrying and report it
+
+    def give_up(msg: str):
+        failed.append(msg)
+        return RuntimeError(failed[0])
+
+    def put(rng: tuple[int, int]) -> int:
+        a, b = rng
+        for attempt in range(RETRIES):
+            if failed:
+                raise RuntimeError(failed[0])
+            try:
+                resp = _HTTP.put(
+                    f"{base_url}/v2/upload/sessions/{sid}", data=data[a:b], timeout=60,
+                    headers={**headers, "Content-Range": f"bytes {a}-{b - 1}/{total}"},
+                )
+                resp.raise_for_status()
+                return attempt
+            except requests.RequestException as e:
+                if not _retryable(e):
+                    raise give_up(f"chunk {a}-{b - 1} failed: {e}") from e
+                if attempt < RETRIES - 1:
+                    time.sleep(min(2 ** attempt, 8))
+        raise give_up(f"chunk {a}-{b - 1} failed after {RETRIES} attempts")
+
+    todo = [rng for rng in ranges if rng not in received]
+    with ThreadPoolExecutor(max_workers=max(1, WORKERS), thread_name_prefix="gmf-upload") as pool:
+        stats["retries"] += sum(pool.map(put, todo))   # raises on the first chunk that gave up
+    stats["chunks"] = len(ranges)
+    r = _HTTP.post(f"{base_url}/v2/upload/sessions/{sid}/complete", headers=headers, timeout=60)
+    r.raise_for_status()
+    with _SESSIONS_LOCK:
+        _SESSIONS.pop(digest, None)
+    return r.json()["upload_url"]
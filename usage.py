@@ -0,0 +1,291 @@
+# usage.py — GrokMind Fusion usage accounting + session budgets
+# Every upstream call records what it consumed (prompt/completion tokens, audio
+# seconds, n8n executions) and its estimated cost against the current scope:
+# SESSION_ID, page and event type. Rows are rolled up per day in a small SQLite
+# store (GMF_USAGE_DB) with a per-session totals table indexed by cost, so "top
+# sessions by cost" is an index scan. Budgets downgrade the model, then throttle,
+# before a session exceeds GMF_SESSION_BUDGET_USD.
+#
+#   python usage.py top -n 10          # top sessions by cost
+#   python usage.py breakdown --by page,kind
+#   python usage.py bench 100000       # top-N query time over N synthetic sessions
+#
+#   GMF_PRICES='{"grok-4": [3.0, 15.0], "*": [3.0, 15.0]}'   USD per 1M prompt/completion tokens
+#   GMF_AAI_PRICE_PER_HOUR=0.37   GMF_N8N_PRICE_PER_EXECUTION=0
+#   GMF_SESSION_BUDGET_USD=0 (off)  GMF_BUDGET_DOWNGRADE_AT=0.8  GMF_BUDGET_THROTTLE_AT=1.0
+#   GMF_BUDGET_FALLBACK_MODEL=grok-3-mini
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+
+import metrics
+
+DB_PATH = os.getenv("GMF_USAGE_DB", "gmf_usage.db")
+
+DEFAULT_PRICES = {"grok-4": (3.0, 15.0), "grok-3-mini": (0.3, 0.5), "*": (3.0, 15.0)}
+AAI_PRICE_PER_HOUR = float(os.getenv("GMF_AAI_PRICE_PER_HOUR", "0.37"))
+N8N_PRICE_PER_EXECUTION = float(os.getenv("GMF_N8N_PRICE_PER_EXECUTION", "0"))
+
+SESSION_BUDGET_USD = float(os.getenv("GMF_SESSION_BUDGET_USD", "0"))
+DOWNGRADE_AT = float(os.getenv("GMF_BUDGET_DOWNGRADE_AT", "0.8"))
+THROTTLE_AT = float(os.getenv("GMF_BUDGET_THROTTLE_AT", "1.0"))
+FALLBACK_MODEL = os.getenv("GMF_BUDGET_FALLBACK_MODEL", "grok-3-mini")
+
+COST = metrics.counter("gmf_usage_cost_usd_total", "Estimated upstream cost", ("kind", "model"))
+TOKENS = metrics.counter("gmf_usage_tokens_total", "Grok tokens", ("model", "type"))
+BUDGET_ACTIONS = metrics.counter("gmf_budget_actions_total", "Budget downgrades/throttles", ("action",))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    day      TEXT NOT NULL,
+    session  TEXT NOT NULL,
+    page     TEXT NOT NULL,
+    kind     TEXT NOT NULL,              -- grok | transcribe | n8n
+    model    TEXT NOT NULL,              -- model, or n8n event type
+    calls             INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens     INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    audio_s           REAL NOT NULL DEFAULT 0,
+    cost_usd          REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, session, page, kind, model)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sessions (
+    session  TEXT PRIMARY KEY,
+    calls    INTEGER NOT NULL DEFAULT 0,
+    tokens   INTEGER NOT NULL DEFAULT 0,
+    audio_s  REAL NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    first_ts REAL,
+    last_ts  REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_cost ON sessions(cost_usd DESC);
+"""
+
+_local = threading.local()
+
+def _conn() -> sqlite3.Connection:
+    con = getattr(_local, "con", None)
+    if con is None or getattr(_local, "key", None) != (DB_PATH, os.getpid()):
+        con = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.executescript(_SCHEMA)
+        _local.con, _local.key = con, (DB_PATH, os.getpid())
+    return con
+
+def _prices() -> dict:
+    try:
+        return {**DEFAULT_PRICES, **json.loads(os.getenv("GMF_PRICES", "{}"))}
+    except ValueError:
+        return DEFAULT_PRICES
+
+# ---------------------------
+# Scope (who is paying): ContextVar set by pages / job workers
+# ---------------------------
+_SCOPE: contextvars.ContextVar[dict] = contextvars.ContextVar("gmf_usage_scope", default={})
+
+def bind(*, session: str | None = None, page: str | None = None):
+    """Set the scope for the rest of this thread/context (top of each Streamlit run)."""
+    _SCOPE.set({k: v for k, v in {"session": session, "page": page}.items() if v})
+
+@contextmanager
+def scope(**kw):
+    token = _SCOPE.set({**_SCOPE.get(), **{k: v for k, v in kw.items() if v}})
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+def current() -> dict:
+    return dict(_SCOPE.get())
+
+def carry(fn):
+    """Wrap fn so thread-pool tasks are billed to the submitting scope."""
+    captured = _SCOPE.get()
+    def run(*args, **kwargs):
+        token = _SCOPE.set(captured)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _SCOPE.reset(token)
+    return run
+
+# ---------------------------
+# Recording
+# ---------------------------
+def grok_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = _prices()
+    p_in, p_out = prices.get(model, prices["*"])
+    return (prompt_tokens * p_in + completion_tokens * p_out) / 1e6
+
+def record(kind: str, model: str, *, prompt_tokens: int = 0, completion_tokens: int = 0,
+           audio_s: float = 0.0, cost_usd: float | None = None, scope: dict | None = None):
+    """Add one call to the rollups. Never raises: accounting must not break a user action."""
+    sc = scope if scope is not None else _SCOPE.get()
+    session, page = sc.get("session") or "-", sc.get("page") or "-"
+    if cost_usd is None:
+        if kind == "grok":
+            cost_usd = grok_cost(model, prompt_tokens, completion_tokens)
+        elif kind == "transcribe":
+            cost_usd = audio_s / 3600 * AAI_PRICE_PER_HOUR
+        else:
+            cost_usd = N8N_PRICE_PER_EXECUTION
+    COST.inc(cost_usd, kind=kind, model=model)
+    if prompt_tokens or completion_tokens:
+        TOKENS.inc(prompt_tokens, model=model, type="prompt")
+        TOKENS.inc(completion_tokens, model=model, type="completion")
+    now = time.time()
+    day = time.strftime("%Y-%m-%d", time.gmtime(now))
+    try:
+        con = _conn()
+        con.execute("BEGIN IMMEDIATE")
+        con.execute(
+            "INSERT INTO usage VALUES (?,?,?,?,?,1,?,?,?,?) "
+            "ON CONFLICT(day, session, page, kind, model) DO UPDATE SET "
+            "calls=calls+1, prompt_tokens=prompt_tokens+excluded.prompt_tokens, "
+            "completion_tokens=completion_tokens+excluded.completion_tokens, "
+            "audio_s=audio_s+excluded.audio_s, cost_usd=cost_usd+excluded.cost_usd",
+            (day, session, page, kind, model, prompt_tokens, completion_tokens, audio_s, cost_usd),
+        )
+        con.execute(
+            "INSERT INTO sessions VALUES (?,1,?,?,?,?,?) ON CONFLICT(session) DO UPDATE SET "
+            "calls=calls+1, tokens=tokens+excluded.tokens, audio_s=audio_s+excluded.audio_s, "
+            "cost_usd=cost_usd+excluded.cost_usd, last_ts=excluded.last_ts",
+            (session, prompt_tokens + completion_tokens, audio_s, cost_usd, now, now),
+        )
+        con.execute("COMMIT")
+    except sqlite3.Error as e:
+        try:
+            _conn().execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+        print(f"(warn) usage accounting failed: {e}")
+
+# ---------------------------
+# Budgets
+# ---------------------------
+def session_cost(session: str | None = None) -> float:
+    session = session or _SCOPE.get().get("session")
+    if not session:
+        return 0.0
+    try:
+        row = _conn().execute("SELECT cost_usd FROM sessions WHERE session=?", (session,)).fetchone()
+    except sqlite3.Error:
+        return 0.0
+    return row[0] if row else 0.0
+
+def choose_model(model: str, *, session: str | None = None, prompt_tokens: int = 0) -> str:
+    """
+    Budget gate for a Grok call in the current scope. Spend so far plus this prompt's
+    input cost is compared with the budget: past DOWNGRADE_AT the call moves to
+    FALLBACK_MODEL, past THROTTLE_AT it raises RuntimeError instead of overrunning.
+    """
+    if SESSION_BUDGET_USD <= 0:
+        return model
+    spent = session_cost(session)
+    if (spent + grok_cost(FALLBACK_MODEL, prompt_tokens, 0)) / SESSION_BUDGET_USD >= THROTTLE_AT:
+        BUDGET_ACTIONS.inc(action="throttle")
+        raise RuntimeError(f"Session budget of ${SESSION_BUDGET_USD:.2f} reached; try again in a new session.")
+    if (spent + grok_cost(model, prompt_tokens, 0)) / SESSION_BUDGET_USD >= DOWNGRADE_AT and model != FALLBACK_MODEL:
+        BUDGET_ACTIONS.inc(action="downgrade")
+        return FALLBACK_MODEL
+    return model
+
+def check(session: str | None = None):
+    """Raise RuntimeError if the session is past its throttle point (non-Grok calls)."""
+    if SESSION_BUDGET_USD > 0 and session_cost(session) >= SESSION_BUDGET_USD * THROTTLE_AT:
+        BUDGET_ACTIONS.inc(action="throttle")
+        raise RuntimeError(f"Session budget of ${SESSION_BUDGET_USD:.2f} reached.")
+
+# ---------------------------
+# Queries
+# ---------------------------
+def top_sessions(n: int = 10, *, by: str = "cost_usd") -> list[dict]:
+    """Top sessions by cost (or tokens / audio_s / calls). Uses the cost index for the default."""
+    if by not in ("cost_usd", "tokens", "audio_s", "calls"):
+        raise ValueError(f"Unknown sort column: {by}")
+    cur = _conn().execute(
+        f"SELECT session, calls, tokens, audio_s, cost_usd, first_ts, last_ts FROM sessions "
+        f"ORDER BY {by} DESC LIMIT ?", (n,),
+    )
+    keys = ("session", "calls", "tokens", "audio_s", "cost_usd", "first_ts", "last_ts")
+    return [dict(zip(keys, row)) for row in cur.fetchall()]
+
+def breakdown(*, by: tuple[str, ...] = ("page", "kind"), session: str | None = None,
+              since_day: str | None = None) -> list[dict]:
+    """Totals grouped by any of day/session/page/kind/model, most expensive first."""
+    cols = [c for c in by if c in ("day", "session", "page", "kind", "model")]
+    if not cols:
+        raise ValueError("group by at least one of day, session, page, kind, model")
+    where, args = [], []
+    if session:
+        where.append("session=?")
+        args.append(session)
+    if since_day:
+        where.append("day>=?")
+        args.append(since_day)
+    sql = (f"SELECT {', '.join(cols)}, SUM(calls), SUM(prompt_tokens), SUM(completion_tokens), "
+           f"SUM(audio_s), SUM(cost_usd) FROM usage {'WHERE ' + ' AND '.join(where) if where else ''} "
+           f"GROUP BY {', '.join(cols)} ORDER BY SUM(cost_usd) DESC")
+    keys = (*cols, "calls", "prompt_tokens", "completion_tokens", "audio_s", "cost_usd")
+    return [dict(zip(keys, row)) for row in _conn().execute(sql, args).fetchall()]
+
+def bench(n_sessions: int = 100_000) -> dict:
+    """Time top_sessions() over n synthetic sessions in a scratch DB."""
+    import random
+    import tempfile
+    global DB_PATH
+    saved = DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        DB_PATH = os.path.join(tmp, "usage_bench.db")
+        try:
+            con = _conn()
+            rnd = random.Random(7)
+            now = time.time()
+            con.execute("BEGIN")
+            con.executemany("INSERT INTO sessions VALUES (?,?,?,?,?,?,?)", (
+                (f"sess-{i:08x}", rnd.randint(1, 50), rnd.randint(100, 200_000), 0.0,
+                 rnd.random() * 5, now, now) for i in range(n_sessions)))
+            con.execute("COMMIT")
+            t0 = time.perf_counter()
+            for _ in range(20):
+                top = top_sessions(10)
+            per_query_ms = (time.perf_counter() - t0) / 20 * 1000
+            con.close()
+            _local.con = None
+        finally:
+            DB_PATH = saved
+    return {"sessions": n_sessions, "top10_ms": round(per_query_ms, 3), "top_cost_usd": round(top[0]["cost_usd"], 4)}
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="GrokMind Fusion usage accounting")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("top", help="top sessions by cost")
+    t.add_argument("-n", type=int, default=10)
+    t.add_argument("--by", default="cost_usd")
+    b = sub.add_parser("breakdown", help="totals grouped by columns")
+    b.add_argument("--by", default="page,kind")
+    b.add_argument("--session")
+    b.add_argument("--since", help="YYYY-MM-DD")
+    be = sub.add_parser("bench", help="top-N query time over synthetic sessions")
+    be.add_argument("n", nargs="?", type=int, default=100_000)
+    args = ap.parse_args(argv)
+    if args.cmd == "top":
+        out = top_sessions(args.n, by=args.by)
+    elif args.cmd == "breakdown":
+        out = breakdown(by=tuple(args.by.split(",")), session=args.session, since_day=args.since)
+    else:
+        out = bench(args.n)
+    print(json.dumps(out, indent=2))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,51 +2,264 @@
 # STT: AssemblyAI (works today)
 # TTS: macOS 'say' (temporary, simple & offline). We can swap to a cloud TTS later.
 
+from __future__ import annotations
+
 import os
+import json
+import time
+import uuid
+import threading
 import subprocess
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from dotenv import load_dotenv
 
 import assemblyai as aai
 
+import metrics
+import traffic
+import usage
+import upload
+from transcript import WordTable
+
 load_dotenv()
 
+# -------- STT config --------
+# Completion arrives by webhook when AAI_WEBHOOK_URL (public URL that forwards to the
+# local receiver on AAI_WEBHOOK_PORT) is set; adaptive polling is always the fallback.
+AAI_WEBHOOK_URL = os.getenv("AAI_WEBHOOK_URL", "")
+AAI_WEBHOOK_PORT = int(os.getenv("AAI_WEBHOOK_PORT", "8765"))
+AAI_WEBHOOK_SECRET = os.getenv("AAI_WEBHOOK_SECRET") or uuid.uuid4().hex
+AAI_WEBHOOK_HEADER = "X-GMF-Webhook-Secret"
+POLL_FIRST_S, POLL_MAX_S = 1.0, 10.0            # polling only
+POLL_FIRST_HOOKED_S, POLL_MAX_HOOKED_S = 15.0, 30.0   # safety net when webhooks are on
+
+AAI_LATENCY = metrics.histogram(
+    "gmf_aai_transcribe_seconds", "AssemblyAI submit-to-completion time (queue + processing)", ("outcome",),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+AAI_SUBMIT = metrics.histogram("gmf_aai_submit_seconds", "AssemblyAI upload + submit time", ("outcome",))
+AAI_COMPLETIONS = metrics.counter("gmf_aai_completions_total", "Transcript completions by channel", ("via",))
+AAI_PENDING = metrics.gauge("gmf_aai_pending_jobs", "Transcripts submitted and not yet complete")
+
+_AAI_KEY: str | None = None
+
 def _aai_ready():
+    """Configure the SDK once per key (not on every call). ASSEMBLYAI_BASE_URL points at a stand-in."""
+    global _AAI_KEY
     api_key = os.getenv("ASSEMBLYAI_API_KEY")
     if not api_key:
         raise RuntimeError("ASSEMBLYAI_API_KEY is not set in .env")
-    aai.settings.api_key = api_key
+    if api_key != _AAI_KEY:
+        aai.settings.api_key = api_key
+        base_url = os.getenv("ASSEMBLYAI_BASE_URL")
+        if base_url:
+            aai.settings.base_url = base_url
+        _AAI_KEY = api_key
 
 # -------- STT --------
-def transcribe_file(path: str) -> dict:
+@dataclass
+class TranscriptJob:
+    """A submitted transcript. Await `future` (or asyncio.wrap_future(job.future))."""
+    id: str
+    path: str
+    future: Future
+    submitted: float
+    status: str = "queued"
+    via: str = ""              # webhook | poll
+    polls: int = 0
+    interval: float = POLL_FIRST_S
+    next_poll: float = 0.0
+    upload: dict = field(default_factory=dict)   # upload.upload_file stats (bytes saved, time)
+    scope: dict = field(default_factory=dict)    # usage.py scope at submit (the poller thread bills it)
+
+    def elapsed(self) -> float:
+        return time.time() - self.submitted
+
+_JOBS: dict[str, TranscriptJob] = {}
+_JOBS_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_POLLER: threading.Thread | None = None
+_RECEIVER: ThreadingHTTPServer | None = None
+
+def transcribe_async(path: str) -> TranscriptJob:
+    """
+    Compress + upload (upload.py) and submit a local audio file, then return with a job whose
+    future resolves to {text, confidence, words} or {error}. Never blocks on processing.
+    """
+    t0 = time.time()
+    fut: Future = Future()
+    if traffic.enabled():
+        _capture_on_done(fut, path, t0)
+    try:
+        _aai_ready()
+        usage.check()
+        hooked = _ensure_receiver()
+        config = aai.TranscriptionConfig(
+            webhook_url=AAI_WEBHOOK_URL.rstrip("/") + "/aai/webhook",
+            webhook_auth_header_name=AAI_WEBHOOK_HEADER,
+            webhook_auth_header_value=AAI_WEBHOOK_SECRET,
+        ) if hooked else None
+        with AAI_SUBMIT.time():
+            audio_url, upload_stats = upload.upload_file(path, base_url=aai.settings.base_url,
+                                                         api_key=aai.settings.api_key)
+            transcript = aai.Transcriber().submit(audio_url, config)
+        if transcript.status == aai.TranscriptStatus.error:
+            raise RuntimeError(transcript.error or "Unknown AssemblyAI error")
+    except Exception as e:
+        fut.set_result({"error": str(e)})
+        return TranscriptJob(id="", path=path, future=fut, submitted=t0, status="error")
+
+    first = POLL_FIRST_HOOKED_S if hooked else POLL_FIRST_S
+    job = TranscriptJob(id=transcript.id, path=path, future=fut, submitted=t0,
+                        status=str(getattr(transcript.status, "value", transcript.status)),
+                        interval=first, next_poll=time.time() + first, upload=upload_stats,
+                        scope=usage.current())
+    with _JOBS_LOCK:
+        _JOBS[job.id] = job
+    AAI_PENDING.inc()
+    _ensure_poller()
+    _WAKE.set()
+    return job
+
+def _capture_on_done(fut: Future, path: str, t0: float):
+    """Record the call (shape + submit-to-result latency) for traffic.py once it settles."""
+    try:
+        size = os.path.getsize(path)   # now: callers often delete the temp file afterwards
+    except OSError:
+        size = 0
+    fut.add_done_callback(lambda f: traffic.record(
+        "transcribe", t0, time.time() - t0, "error" not in f.result(),
+        **traffic.transcribe_shape(path, size, f.result())))
+
+def get_job(job_id: str) -> TranscriptJob | None:
+    return _JOBS.get(job_id)
+
+def transcribe_file(path: str, timeout: float | None = None) -> dict:
     """
     Transcribe a local audio file (wav/mp3/m4a/aiff etc.) with AssemblyAI.
     Returns: {text, confidence, words[]} or {error}
+    words is a transcript.WordTable: reads like a list of {text, start, end, confidence}
+    dicts; use words.to_list() before JSON-encoding it.
+    Blocking wrapper over transcribe_async(); prefer the job/future in UI code.
     """
-    _aai_ready()
-    transcriber = aai.Transcriber()
+    job = transcribe_async(path)
     try:
-        transcript = transcriber.transcribe(path)
+        return job.future.result(timeout)
+    except FutureTimeout:
+        return {"error": f"Timed out after {timeout}s waiting for transcript {job.id}"}
 
-        if transcript.status == aai.TranscriptStatus.error:
-            return {"error": transcript.error or "Unknown AssemblyAI error"}
-
-        words = []
-        if transcript.words:
-            for w in transcript.words:
-                words.append({
-                    "text": w.text,
-                    "start": getattr(w, "start", None),
-                    "end": getattr(w, "end", None),
-                    "confidence": getattr(w, "confidence", None),
-                })
-        return {
-            "text": transcript.text or "",
-            "confidence": getattr(transcript, "confidence", None),
-            "words": words,
-        }
+def _result(transcript) -> dict:
+    if transcript.status == aai.TranscriptStatus.error:
+        return {"error": transcript.error or "Unknown AssemblyAI error"}
+    return {
+        "text": transcript.text or "",
+        "confidence": getattr(transcript, "confidence", None),
+        "words": WordTable.from_words(transcript.words or []),
+        "audio_duration": getattr(transcript, "audio_duration", None),
+    }
+
+def _fetch(job_id: str):
+    """Single non-blocking GET (aai.Transcript.get_by_id would poll until completion)."""
+    client = aai.Client.get_default()
+    return aai.api.get_transcript(client.http_client, job_id)
+
+def _resolve(job_id: str, via: str, transcript=None) -> bool:
+    """Fetch (if needed) and settle a job. Returns True once the job is finished."""
+    job = _JOBS.get(job_id)
+    if job is None or job.future.done():
+        return True
+    try:
+        if transcript is None:
+            transcript = _fetch(job_id)
     except Exception as e:
-        return {"error": str(e)}
+        job.status = f"fetch failed ({e})"
+        return False
+    job.status = str(getattr(transcript.status, "value", transcript.status))
+    if transcript.status not in (aai.TranscriptStatus.completed, aai.TranscriptStatus.error):
+        return False
+    with _JOBS_LOCK:
+        if _JOBS.pop(job_id, None) is None:
+            return True   # webhook and poller raced; the other one settled it
+    res = _result(transcript)
+    if "error" not in res:
+        usage.record("transcribe", "assemblyai", audio_s=float(res["audio_duration"] or 0), scope=job.scope)
+    job.via = via
+    AAI_PENDING.dec()
+    AAI_COMPLETIONS.inc(via=via)
+    AAI_LATENCY.observe(job.elapsed(), outcome="error" if "error" in res else "ok")
+    job.future.set_result(res)
+    return True
+
+# ---- adaptive poller (one thread for all pending jobs) ----
+def _ensure_poller():
+    global _POLLER
+    if _POLLER is None or not _POLLER.is_alive():
+        with _JOBS_LOCK:
+            if _POLLER is None or not _POLLER.is_alive():
+                _POLLER = threading.Thread(target=_poll_loop, name="gmf-aai-poller", daemon=True)
+                _POLLER.start()
+
+def _poll_loop():
+    hooked = bool(AAI_WEBHOOK_URL)
+    cap = POLL_MAX_HOOKED_S if hooked else POLL_MAX_S
+    while True:
+        with _JOBS_LOCK:
+            jobs = list(_JOBS.values())
+        now = time.time()
+        wait = min((j.next_poll for j in jobs), default=now + 60) - now
+        if wait > 0:
+            _WAKE.wait(wait)
+            _WAKE.clear()
+            continue
+        for job in jobs:
+            if job.next_poll > time.time():
+                continue
+            job.polls += 1
+            if not _resolve(job.id, "poll"):
+                job.interval = min(job.interval * 1.6, cap)   # back off while queued/processing
+                job.next_poll = time.time() + job.interval
+
+# ---- webhook receiver (side thread) ----
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path.split("?")[0] != "/aai/webhook" or self.headers.get(AAI_WEBHOOK_HEADER) != AAI_WEBHOOK_SECRET:
+            self.send_error(403)
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError:
+            self.send_error(400)
+            return
+        self.send_response(200)
+        self.end_headers()
+        tid = body.get("transcript_id")
+        if tid:
+            # Fetch off the request thread so AssemblyAI's callback returns immediately
+            threading.Thread(target=_resolve, args=(tid, "webhook"), daemon=True).start()
+
+    def log_message(self, *_args):
+        pass
+
+def _ensure_receiver() -> bool:
+    """Start the webhook receiver once if AAI_WEBHOOK_URL is configured."""
+    global _RECEIVER
+    if not AAI_WEBHOOK_URL:
+        return False
+    if _RECEIVER is None:
+        with _JOBS_LOCK:
+            if _RECEIVER is None:
+                try:
+                    srv = ThreadingHTTPServer(("0.0.0.0", AAI_WEBHOOK_PORT), _WebhookHandler)
+                except OSError as e:
+                    print(f"(warn) AssemblyAI webhook receiver not started on :{AAI_WEBHOOK_PORT}: {e}")
+                    return False
+                srv.daemon_threads = True
+                threading.Thread(target=srv.serve_forever, name="gmf-aai-webhook", daemon=True).start()
+                _RECEIVER = srv
+    return True
 
 # -------- TTS (temporary: macOS 'say') --------
 def tts_say(text: str):